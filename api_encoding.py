@@ -0,0 +1,113 @@
+import gzip
+import json
+
+from flask import Response, request
+
+from field_selection import expand_fields
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is optional - JSON is always available
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional - gzip is used when it's missing
+    brotli = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+# Bodies smaller than this aren't worth the compression overhead
+MIN_COMPRESS_SIZE = 1024
+# Payload keys holding product records that a `fields` projection applies to
+PRODUCT_KEYS = ("data", "products")
+# Always kept so projected records can still be matched up
+KEY_FIELDS = ("ASIN",)
+
+
+def requested_fields(payload=None):
+    """Fields asked for via ?fields=a,b or a JSON body "fields" list; None means everything
+
+    Presets and group names (e.g. "price") are expanded to the fields they cover.
+    """
+    fields = request.args.get("fields")
+    if fields:
+        fields = [f.strip() for f in fields.split(",")]
+    elif payload and payload.get("fields"):
+        fields = payload["fields"]
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        fields = [str(f).strip() for f in fields]
+    else:
+        return None
+    return expand_fields([f for f in fields if f]) or None
+
+
+def project(product, fields):
+    """Keep only the requested fields; a trailing * matches a prefix (e.g. "Tech_*", "Bullet Point*")"""
+    exact = set(fields) | set(KEY_FIELDS)
+    prefixes = tuple(f[:-1] for f in fields if f.endswith("*"))
+    return {k: v for k, v in product.items() if k in exact or (prefixes and k.startswith(prefixes))}
+
+
+def _project_payload(payload, fields):
+    for key in PRODUCT_KEYS:
+        value = payload.get(key)
+        if isinstance(value, list):
+            payload[key] = [project(p, fields) if isinstance(p, dict) else p for p in value]
+        elif isinstance(value, dict):
+            payload[key] = project(value, fields)
+    return payload
+
+
+def _wants_msgpack():
+    if request.args.get("format") == "msgpack":
+        return True
+    best = request.accept_mimetypes.best_match(("application/json",) + MSGPACK_TYPES, default="application/json")
+    return best in MSGPACK_TYPES
+
+
+def api_response(payload, status=200, fields=None):
+    """Serialize an API payload per the client's Accept header, after applying any `fields` projection
+
+    JSON is compact unless ?pretty=1; MessagePack is used for Accept: application/msgpack (or
+    ?format=msgpack) when the msgpack package is installed.
+    """
+    fields = fields if fields is not None else requested_fields()
+    if fields:
+        payload = _project_payload(dict(payload), fields)
+
+    if _wants_msgpack():
+        if msgpack is None:
+            return Response(json.dumps({"success": False, "error": "MessagePack is not available on this server"}),
+                            status=406, mimetype="application/json")
+        response = Response(msgpack.packb(payload, use_bin_type=True, default=str), status=status,
+                            mimetype="application/msgpack")
+        response.vary.add("Accept")
+        return response
+
+    if request.args.get("pretty") in ("1", "true"):
+        body = json.dumps(payload, ensure_ascii=False, indent=2, default=str)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+    response = Response(body, status=status, mimetype="application/json")
+    response.vary.add("Accept")
+    return response
+
+
+def compress_response(response):
+    """Apply brotli or gzip Content-Encoding when the client accepts it and the body is large enough"""
+    response.vary.add("Accept-Encoding")
+    if response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers:
+        return response
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(body, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=5))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
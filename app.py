@@ -1,48 +1,126 @@
-from flask import Flask, render_template, request, send_file, session, jsonify
+import time
+_import_started = time.perf_counter()  # Start-up import time is reported by create_app()
+
+from flask import Flask, Blueprint, current_app, render_template, request, send_file, session, jsonify, Response, stream_with_context
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from bs4 import BeautifulSoup, SoupStrainer
 import os
+import sys
 import re
 from datetime import datetime
 import io
 import json
-import html
-import time
 import random
 import logging
 from requests.exceptions import RequestException
 import traceback
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("amazon_scraper_app.log"),
-        logging.StreamHandler()
-    ]
-)
-
-app = Flask(__name__)
-app.secret_key = "ecombuddha_secret_key_change_in_production"  # Change this in production
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Limit file upload size to 16MB
-
-# Create logs directory if it doesn't exist
-if not os.path.exists('logs'):
-    os.makedirs('logs')
-
-# Create debug_html directory if it doesn't exist
-if not os.path.exists('debug_html'):
-    os.makedirs('debug_html')
+import threading
+import uuid
+from collections import deque
+from profiling import ScrapeProfiler, no_span
+from selector_stats import SelectorStats
+from retry_scheduler import RetryPolicy, RetryScheduler
+from broker import open_broker
+from embedded_data import extract_embedded_data
+from variations import VariationFamilyTracker
+from listing_crawler import ASIN_RE, ListingCrawler
+from offers import OfferScraper
+from reviews import ReviewScraper
+from logging_setup import configure_logging, log_context
+from delivery import parse_delivery
+from tech_schema import TechSchemaRegistry
+from product_record import ProductRecord, product_columns
+from results_store import ResultStore
+from coalesce import SingleFlight, CoalescedScrapeTimeout
+from watchlist import WatchlistStore, WatchlistScheduler, start_when_leader
+from api_encoding import api_response, compress_response, requested_fields
+from field_selection import BUYBOX_CONTAINERS, BUYBOX_GROUPS, field_group, resolve_groups
+from image_assets import ImageDownloader, base_image_url, is_image_cdn_url
+from webhooks import WebhookDispatcher, WebhookOutbox
+from urllib.parse import urlsplit
+
+# Routes are registered on a blueprint; create_app() builds the Flask app (see wsgi.py)
+bp = Blueprint('scraper', __name__)
+
+DEFAULT_CONFIG = {
+    'SECRET_KEY': "ecombuddha_secret_key_change_in_production",  # Change this in production
+    'SESSION_TYPE': 'filesystem',
+    'JSONIFY_PRETTYPRINT_REGULAR': False,  # API bodies are compact; add ?pretty=1 for indented JSON
+    'MAX_CONTENT_LENGTH': 16 * 1024 * 1024,  # Limit file upload size to 16MB
+    'LOG_FILE': "amazon_scraper_app.log",
+    'LOG_ROTATE': os.environ.get('LOG_ROTATE', '1') != '0',  # 0 = leave rotation to logrotate (multi-process servers)
+    'PROFILES_DIR': 'profiles',
+    'PROFILE_SAMPLE_RATE': 0.0,  # Fraction of scrapes to profile automatically (0 = only on request)
+    'PROFILES_TO_KEEP': 200,  # Newest profiles kept in PROFILES_DIR; older ones are deleted
+    'PROFILE_MAX_AGE': 7 * 24 * 3600,  # Seconds a profile is kept (None = no age limit)
+    'ADAPTIVE_SELECTORS': False,  # Reorder selector fallbacks by observed hit rate
+    'BROKER_URL': os.environ.get('BROKER_URL', 'sqlite:///broker.db'),  # Shared job broker for worker.py
+    'PINNED_SELECTORS': {},  # {field: selector} always tried first, e.g. {"title": "#productTitle"}
+    'BROWSER_FALLBACK': False,  # Escalate blocked/incomplete HTTP scrapes to a headless browser
+    'BROWSER_POOL_SIZE': 2,
+    'BROWSER_DRIVER_PATH': os.environ.get('BROWSER_DRIVER_PATH'),  # chromedriver path; None lets Selenium Manager find it
+    'TECH_SCHEMA_FILE': 'tech_schema.json',  # Persistent raw label -> Tech_* column mapping
+    'RESULTS_DB': 'results.db',  # Shared by all workers, so any of them can page or export a result
+    'RESULTS_TO_KEEP': 50,  # Recent result sets kept server-side for the results view and downloads
+    'RESULTS_PAGE_SIZE': 20,
+    'COALESCE_TIMEOUT': 120,  # Seconds a request waits on an identical in-flight scrape before giving up
+    'WATCHLIST_DB': 'watchlist.db',
+    'WATCHLIST_SCHEDULER': False,  # Run recurring watchlist scrapes in one app worker (or run watchlist.py separately)
+    'WATCHLIST_BUDGETS': {},  # {marketplace: scrapes per minute}, e.g. {"in": 30}
+    'WATCHLIST_DEFAULT_BUDGET': 20,
+    'AMAZON_BASE_URL': os.environ.get('AMAZON_BASE_URL'),  # Override the marketplace URL, e.g. a local mock_amazon.py
+    'REQUEST_DELAY': 2,  # Base pause (seconds) before each request to Amazon
+    'DEBUG_HTML_DIR': 'debug_html',  # Where fetched product pages are saved for debugging (None to disable)
+    'BULK_REQUEST_DELAY': (2, 5),  # Random pause range between products in a bulk job
+    'REVIEWS_DIR': 'reviews',  # Scraped reviews (<asin>.ndjson) and their resume checkpoints
+    'IMAGES_DIR': 'images',  # Content-addressed store for downloaded product images
+    'IMAGE_SIZE': 1000,  # Longest side (px) of the image variant to download; None for originals
+    'IMAGE_HOST_CONCURRENCY': 4,
+    'WEBHOOK_SECRET': os.environ.get('WEBHOOK_SECRET', 'change_this_webhook_secret'),  # HMAC key for callback payloads
+    'WEBHOOK_OUTBOX': 'webhook_outbox.db',  # Undelivered callback batches survive restarts here
+    'WEBHOOK_BATCH_SIZE': 25,  # Push a batch once this many products are ready...
+    'WEBHOOK_BATCH_SECONDS': 10,  # ...or once the oldest buffered product has waited this long
+    # Background threads are started by create_app(), unless deferred to after fork (gunicorn.conf.py)
+    'START_BACKGROUND_SERVICES': os.environ.get('DEFER_BACKGROUND_SERVICES') != '1',
+}
+
+# Containers holding technical details / product information rows, walked once per page
+TECH_DETAIL_CONTAINERS = ", ".join([
+    "#detailBullets_feature_div",
+    "#detailBulletsWrapper_feature_div",
+    "#productDetails_techSpec_section_1",
+    "#productDetails_techSpec_section_2",
+    "#productDetails_detailBullets_sections1",
+    ".detail-bullets-wrapper",
+    ".prodDetTable",
+    ".a-keyvalue"
+])
 
 class AmazonScraper:
-    def __init__(self, country="in"):
+    # Fields that must be present for the plain HTTP result to be accepted in tiered mode
+    REQUIRED_FIELDS = ("Title", "Current Price")
+
+    def __init__(self, country="in", selector_stats=None, browser_pool=None, use_embedded_data=True, tech_schema=None,
+                 base_url=None, request_delay=2, debug_html_dir="debug_html"):
         self.country = country
-        self.base_url = f"https://www.amazon.{country}"
+        # Raw pages are saved here for debugging (None disables); load tests point it at a scratch dir
+        self.debug_html_dir = debug_html_dir
+        # Canonical Tech_* column names, shared across scrapers so exports keep one column per attribute
+        self.tech_schema = tech_schema or TechSchemaRegistry()
+        # Read title/prices/images/variations from inline JSON before falling back to DOM selectors
+        self.use_embedded_data = use_embedded_data
+        # base_url can point at a local mock server (mock_amazon.py) for offline load tests
+        self.base_url = (base_url or f"https://www.amazon.{country}").rstrip("/")
+        self.request_delay = request_delay
         self.session = requests.Session()
+        # Optional headless-browser tier, only used when the HTTP tier is blocked or incomplete
+        self.browser_pool = browser_pool
+        self.fetch_stats = {"http": 0, "escalated_blocked": 0, "escalated_missing_fields": 0, "browser_success": 0, "browser_failed": 0}
+        self._stats_lock = threading.Lock()
+        # Selector hit/miss telemetry, shared across scrapers so counts are kept per marketplace
+        self.selector_stats = selector_stats or SelectorStats()
+        # Per-thread reason for the most recent failed request (used for retry history)
+        self._request_state = threading.local()
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15',
@@ -53,8 +131,29 @@ class AmazonScraper:
     def _get_random_user_agent(self):
         return random.choice(self.user_agents)
 
-    def _make_request(self, url, max_retries=3, delay=2):
+    def _ordered_selectors(self, field, selectors):
+        """Selectors for a field in try order (adaptive/pinned ordering if enabled)"""
+        return self.selector_stats.order(self.country, field, selectors)
+
+    def _record_selector(self, field, selector, hit):
+        self.selector_stats.record(self.country, field, selector, hit)
+
+    def _count_fetch(self, key):
+        with self._stats_lock:
+            self.fetch_stats[key] += 1
+
+    def get_fetch_stats(self):
+        """Fetch-tier counters plus the share of scrapes escalated to the browser"""
+        with self._stats_lock:
+            stats = dict(self.fetch_stats)
+        escalated = stats["escalated_blocked"] + stats["escalated_missing_fields"]
+        stats["escalation_rate"] = round(escalated / stats["http"], 4) if stats["http"] else 0.0
+        return stats
+
+    def _make_request(self, url, max_retries=3, delay=None):
         """Make a request with retries and random delays"""
+        if delay is None:
+            delay = self.request_delay
         headers = {
             "User-Agent": self._get_random_user_agent(),
             "Accept-Language": "en-US,en;q=0.9",
@@ -71,7 +170,10 @@ class AmazonScraper:
             "upgrade-insecure-requests": "1"
         }
 
+        self._request_state.last_error = None
         for attempt in range(max_retries):
+            # Only back off in-thread when another attempt follows; deferred retries pass max_retries=1
+            retry_follows = attempt < max_retries - 1
             try:
                 # Add random delay between requests
                 time.sleep(random.uniform(delay, delay * 2))
@@ -85,38 +187,121 @@ class AmazonScraper:
                 # Check if response contains captcha challenge
                 if "captcha" in response.text.lower() or response.status_code == 503:
                     logging.warning(f"CAPTCHA detected or service unavailable (503). Attempt {attempt+1}/{max_retries}")
-                    time.sleep(delay * 5)  # Longer delay when CAPTCHA is detected
+                    self._request_state.last_error = "captcha" if response.status_code != 503 else "status 503"
+                    if retry_follows:
+                        time.sleep(delay * 5)  # Longer delay when CAPTCHA is detected
                     continue
 
                 if response.status_code != 200:
                     logging.warning(f"Request failed with status code {response.status_code}. Attempt {attempt+1}/{max_retries}")
-                    time.sleep(delay * 2)
+                    self._request_state.last_error = f"status {response.status_code}"
+                    if retry_follows:
+                        time.sleep(delay * 2)
                     continue
 
                 return response
 
             except RequestException as e:
                 logging.error(f"Request error on attempt {attempt+1}/{max_retries}: {e}")
-                if attempt < max_retries - 1:
+                self._request_state.last_error = f"request error: {e}"
+                if retry_follows:
                     time.sleep(delay * 3)
 
         return None
 
-    def get_product(self, asin):
-        """Scrape Amazon product details by ASIN"""
+    def last_error(self):
+        """Reason the most recent request on this thread failed, if any"""
+        return getattr(self._request_state, 'last_error', None)
+
+    def get_product(self, asin, trace=None, max_retries=3, family_fields=None, fields=None):
+        """Scrape Amazon product details by ASIN
+
+        family_fields: parent-level fields already scraped from a variation sibling;
+        their extractors are skipped and the values copied over.
+        fields: only run the extractors for these fields, presets ("price") or groups
+        (see field_selection.py); None runs everything.
+        """
+        groups = resolve_groups(fields)
+        with log_context(asin=asin, marketplace=self.country):
+            return self._get_product(asin, trace, max_retries, family_fields, groups)
+
+    def _get_product(self, asin, trace, max_retries, family_fields, groups=None):
         url = f"{self.base_url}/dp/{asin}"
         logging.info(f"Scraping product with ASIN: {asin}")
 
-        response = self._make_request(url)
+        # Spans are only recorded when the scrape is being profiled
+        span = trace.span if trace else no_span
+
+        self._count_fetch("http")
+        with span("fetch"):
+            response = self._make_request(url, max_retries=max_retries)
         if not response:
+            if self.browser_pool:
+                self._count_fetch("escalated_blocked")
+                return self._get_product_with_browser(asin, url, span, family_fields, groups)
             logging.error(f"Failed to retrieve product page for ASIN: {asin}")
             return None
 
         # Save HTML for debugging if needed
-        with open(f"debug_html/amazon_{asin}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html", "w", encoding="utf-8") as f:
-            f.write(response.text)
+        if self.debug_html_dir:
+            path = os.path.join(self.debug_html_dir, f"amazon_{asin}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(response.text)
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        product_data = self._parse_product(asin, url, response.text, span, family_fields, groups)
+        product_data["Fetch Tier"] = "http"
+
+        # Cheap tier came back without the fields we need - retry this ASIN in a browser
+        if self.browser_pool and any(product_data.get(field) == "N/A" for field in self.REQUIRED_FIELDS):
+            self._count_fetch("escalated_missing_fields")
+            logging.info(f"Required fields missing for ASIN {asin}, escalating to browser")
+            return self._get_product_with_browser(asin, url, span, family_fields, groups) or product_data
+
+        return product_data
+
+    def _get_product_with_browser(self, asin, url, span, family_fields=None, groups=None):
+        """Fetch and parse a product page with a pooled headless browser"""
+        try:
+            with span("browser_fetch"):
+                page_source = self.browser_pool.get_page_source(url)
+        except Exception as e:
+            # Includes BrowserPageBlocked (CAPTCHA / product never loaded), so blocks count as failures
+            self._count_fetch("browser_failed")
+            self._request_state.last_error = f"browser: {e}"
+            logging.error(f"Browser fetch failed for ASIN {asin}: {e}")
+            return None
+
+        self._count_fetch("browser_success")
+        product_data = self._parse_product(asin, url, page_source, span, family_fields, groups)
+        product_data["Fetch Tier"] = "browser"
+        return product_data
+
+    def _parse_product(self, asin, url, page_html, span=no_span, family_fields=None, groups=None):
+        """Run the extractors over a fetched product page (only those for `groups` if given)"""
+        def wanted(group):
+            return groups is None or group in groups
+
+        # Fast path: inline JSON/state blobs, scanned without building a DOM
+        embedded = {}
+        if self.use_embedded_data and (groups is None or groups & {"title", "prices", "images", "variations"}):
+            with span("embedded_data"):
+                embedded = extract_embedded_data(page_html)
+
+        # The DOM is only built once an extractor actually needs it. Buy-box-only selections
+        # parse just the centre column and buy box; anything else needs the whole page.
+        restricted = groups is not None and groups <= BUYBOX_GROUPS
+        parsed = {}
+        def get_soup(full=not restricted):
+            if full or "full" in parsed:
+                if "full" not in parsed:
+                    with span("parse"):
+                        parsed["full"] = BeautifulSoup(page_html, "html.parser")
+                return parsed["full"]
+            if "buybox" not in parsed:
+                with span("parse_buybox"):
+                    parsed["buybox"] = BeautifulSoup(page_html, "html.parser",
+                                                     parse_only=SoupStrainer(id=BUYBOX_CONTAINERS))
+            return parsed["buybox"]
 
         # Extract product data with improved selectors
         product_data = {
@@ -126,31 +311,90 @@ class AmazonScraper:
         }
 
         # Extract product title - new selectors based on latest Amazon HTML structure
-        product_data["Title"] = self._extract_title(soup)
+        if wanted("title"):
+            if embedded.get("Title"):
+                product_data["Title"] = embedded["Title"]
+            else:
+                with span("_extract_title"):
+                    product_data["Title"] = self._extract_title(get_soup())
+                if product_data["Title"] == "N/A" and restricted:
+                    product_data["Title"] = self._extract_title(get_soup(full=True))
 
         # Extract prices - current and original
-        price_data = self._extract_prices(soup)
-        product_data.update(price_data)
+        if wanted("prices"):
+            if "Current Price" in embedded and "Original Price (MRP)" in embedded:
+                product_data["Current Price"] = embedded["Current Price"]
+                product_data["Original Price (MRP)"] = embedded["Original Price (MRP)"]
+                product_data["Discount Percentage"] = self._format_discount(
+                    embedded["current_price_value"], embedded["original_price_value"])
+            else:
+                with span("_extract_prices"):
+                    price_data = self._extract_prices(get_soup())
+                if price_data["Current Price"] == "N/A" and restricted:
+                    # Unusual layout - fall back to the whole page
+                    price_data = self._extract_prices(get_soup(full=True))
+                # Keep whichever price the fast path did find
+                if "Current Price" in embedded:
+                    price_data["Current Price"] = embedded["Current Price"]
+                product_data.update(price_data)
+
+        if wanted("availability"):
+            with span("_extract_availability"):
+                product_data["Availability"] = self._extract_availability(get_soup())
+
+        # Images come from the embedded image data, or the image block when that's missing
+        if wanted("images"):
+            images = embedded.get("images")
+            if not images:
+                with span("_extract_images"):
+                    images = self._extract_images(get_soup(full=True))
+            if images:
+                product_data["Main Image"] = images[0]
+                product_data["Image URLs"] = "\n".join(images)
+
+        # Variation family is only available from the embedded data
+        variations = embedded.get("variations", {}) if wanted("variations") else {}
+        if variations.get("parent_asin"):
+            product_data["Parent ASIN"] = variations["parent_asin"]
+        children = variations.get("children")
+        if children:
+            product_data["Variation ASINs"] = ", ".join(children)
+            if asin in children:
+                product_data["Variation Attributes"] = "; ".join(f"{k}: {v}" for k, v in children[asin].items())
+
+        # Fields shared with an already-scraped variation sibling aren't extracted again
+        family_fields = family_fields or {}
+        for key, value in family_fields.items():
+            if wanted(field_group(key)):
+                product_data.setdefault(key, value)
 
         # Extract bullet points
-        bullet_points = self._extract_bullet_points(soup)
-        product_data["Bullet Points"] = "\n".join(bullet_points) if bullet_points else "N/A"
+        if "Bullet Points" not in family_fields and wanted("bullets"):
+            with span("_extract_bullet_points"):
+                bullet_points = self._extract_bullet_points(get_soup())
+            product_data["Bullet Points"] = "\n".join(bullet_points) if bullet_points else "N/A"
 
-        # Add individual bullet points
-        for i, bullet in enumerate(bullet_points, 1):
-            if i <= 10:  # Limit to 10 bullet points to avoid too many columns
-                product_data[f"Bullet Point {i}"] = bullet
+            # Add individual bullet points
+            for i, bullet in enumerate(bullet_points, 1):
+                if i <= 10:  # Limit to 10 bullet points to avoid too many columns
+                    product_data[f"Bullet Point {i}"] = bullet
 
         # Extract delivery information
-        delivery_data = self._extract_delivery_info(soup)
-        product_data.update(delivery_data)
+        if wanted("delivery"):
+            with span("_extract_delivery_info"):
+                delivery_data = self._extract_delivery_info(get_soup())
+            product_data.update(delivery_data)
 
         # Extract description
-        product_data["Description"] = self._extract_description(soup)
+        if "Description" not in family_fields and wanted("description"):
+            with span("_extract_description"):
+                product_data["Description"] = self._extract_description(get_soup())
 
         # Extract technical details and product information
-        tech_details = self._extract_technical_details(soup)
-        product_data.update(tech_details)
+        if wanted("technical_details"):
+            with span("_extract_technical_details"):
+                tech_details = self._extract_technical_details(get_soup())
+            product_data.update(tech_details)
 
         return product_data
 
@@ -166,10 +410,12 @@ class AmazonScraper:
             "#title h1 span"
         ]
 
-        for selector in title_selectors:
+        for selector in self._ordered_selectors("title", title_selectors):
             title_element = soup.select_one(selector)
             if title_element and title_element.get_text(strip=True):
+                self._record_selector("title", selector, True)
                 return title_element.get_text(strip=True)
+            self._record_selector("title", selector, False)
 
         logging.warning("Failed to extract product title")
         return "N/A"
@@ -196,7 +442,7 @@ class AmazonScraper:
         ]
 
         current_price_value = 0
-        for selector in current_price_selectors:
+        for selector in self._ordered_selectors("current_price", current_price_selectors):
             element = soup.select_one(selector)
             if element and element.get_text(strip=True):
                 current_price = element.get_text(strip=True)
@@ -213,9 +459,11 @@ class AmazonScraper:
                 numeric_price = re.sub(r'[^\d.]', '', current_price)
                 try:
                     current_price_value = float(numeric_price)
+                    self._record_selector("current_price", selector, True)
                     break
                 except ValueError:
-                    continue
+                    pass
+            self._record_selector("current_price", selector, False)
 
         # Original price / MRP selectors
         original_price_selectors = [
@@ -230,7 +478,7 @@ class AmazonScraper:
         ]
 
         original_price_value = 0
-        for selector in original_price_selectors:
+        for selector in self._ordered_selectors("original_price", original_price_selectors):
             element = soup.select_one(selector)
             if element and element.get_text(strip=True):
                 original_price = element.get_text(strip=True)
@@ -240,17 +488,23 @@ class AmazonScraper:
                 numeric_price = re.sub(r'[^\d.]', '', original_price)
                 try:
                     original_price_value = float(numeric_price)
+                    self._record_selector("original_price", selector, True)
                     break
                 except ValueError:
-                    continue
+                    pass
+            self._record_selector("original_price", selector, False)
 
         # Calculate discount percentage
-        if original_price_value > 0 and current_price_value > 0 and original_price_value > current_price_value:
-            discount = ((original_price_value - current_price_value) / original_price_value) * 100
-            price_data["Discount Percentage"] = f"{discount:.1f}%"
+        price_data["Discount Percentage"] = self._format_discount(current_price_value, original_price_value)
 
         return price_data
 
+    def _format_discount(self, current_price_value, original_price_value):
+        if original_price_value > 0 and current_price_value > 0 and original_price_value > current_price_value:
+            discount = ((original_price_value - current_price_value) / original_price_value) * 100
+            return f"{discount:.1f}%"
+        return "N/A"
+
     def _extract_bullet_points(self, soup):
         """Extract product bullet points from various possible locations"""
         bullet_selectors = [
@@ -262,21 +516,66 @@ class AmazonScraper:
         ]
 
         all_bullets = []
-        for selector in bullet_selectors:
+        for selector in self._ordered_selectors("bullet_points", bullet_selectors):
             bullets = soup.select(selector)
             if bullets:
                 bullet_texts = [b.get_text(strip=True) for b in bullets if b.get_text(strip=True)]
                 if bullet_texts:
                     all_bullets = bullet_texts
+                    self._record_selector("bullet_points", selector, True)
                     break
+            self._record_selector("bullet_points", selector, False)
 
         return all_bullets
 
+    def _extract_images(self, soup):
+        """Extract image URLs from the image block (largest rendition of the main image first)"""
+        images = []
+        main_image = soup.select_one("#landingImage, #imgBlkFront")
+        if main_image:
+            url = main_image.get("data-old-hires")
+            if not url and main_image.get("data-a-dynamic-image"):
+                # {"url": [width, height], ...} - take the largest rendition
+                try:
+                    renditions = json.loads(main_image["data-a-dynamic-image"])
+                    url = max(renditions, key=lambda u: renditions[u][0] * renditions[u][1])
+                except (ValueError, TypeError, IndexError):
+                    url = None
+            images.append(url or main_image.get("src"))
+
+        # Thumbnails carry a size token; without it the CDN serves the full image
+        for thumbnail in soup.select("#altImages img, #imageBlock img.a-dynamic-image"):
+            src = thumbnail.get("src", "")
+            if "/images/I/" in src:
+                images.append(base_image_url(src))
+
+        return [url for url in dict.fromkeys(images) if url and url.startswith("http")]
+
+    def _extract_availability(self, soup):
+        """Extract the stock/availability message from the buy box"""
+        availability_selectors = [
+            "#availability span",
+            "#availability",
+            "#outOfStock .a-color-price",
+            "#availabilityInsideBuyBox_feature_div"
+        ]
+
+        for selector in self._ordered_selectors("availability", availability_selectors):
+            element = soup.select_one(selector)
+            if element and element.get_text(strip=True):
+                self._record_selector("availability", selector, True)
+                return element.get_text(" ", strip=True)
+            self._record_selector("availability", selector, False)
+
+        return "N/A"
+
     def _extract_delivery_info(self, soup):
         """Extract delivery information with improved parsing"""
         delivery_data = {
             "Delivery Date Raw": "N/A",
-            "Delivery Date Parsed": "N/A"
+            "Delivery Date Parsed": "N/A",
+            "Delivery Start": "N/A",
+            "Delivery End": "N/A"
         }
 
         delivery_selectors = [
@@ -290,48 +589,30 @@ class AmazonScraper:
             "#amazonGlobal_feature_div"
         ]
 
-        for selector in delivery_selectors:
+        for selector in self._ordered_selectors("delivery", delivery_selectors):
             element = soup.select_one(selector)
             if element and element.get_text(strip=True):
                 delivery_raw = element.get_text(strip=True)
                 delivery_data["Delivery Date Raw"] = delivery_raw
-                delivery_data["Delivery Date Parsed"] = self._parse_delivery_date(delivery_raw)
+
+                # ISO dates so results sort and filter correctly (and survive JSON round-trips)
+                delivery_range = self._parse_delivery_date(delivery_raw)
+                if delivery_range:
+                    start, end = delivery_range
+                    delivery_data["Delivery Start"] = start.isoformat()
+                    delivery_data["Delivery End"] = end.isoformat()
+                    delivery_data["Delivery Date Parsed"] = start.isoformat() if start == end else f"{start.isoformat()} to {end.isoformat()}"
+                else:
+                    delivery_data["Delivery Date Parsed"] = "Unable to parse date"
+                self._record_selector("delivery", selector, True)
                 break
+            self._record_selector("delivery", selector, False)
 
         return delivery_data
 
     def _parse_delivery_date(self, delivery_text):
-        """Parse delivery text into a standardized date format with improved patterns"""
-        if delivery_text == "N/A":
-            return "N/A"
-
-        # Common patterns in Amazon delivery texts
-        date_patterns = [
-            r'Delivery by (\w+ \d+ - \w+ \d+)',         # "Delivery by Monday, Mar 4 - Wednesday, Mar 6"
-            r'Delivery by (\w+, \w+ \d+)',              # "Delivery by Monday, Mar 4"
-            r'Get it by (\w+, \w+ \d+)',                # "Get it by Monday, Mar 4"
-            r'Delivery (\w+, \w+ \d+)',                 # "Delivery Monday, Mar 4"
-            r'(\d{1,2} \w+ - \d{1,2} \w+)',             # "4 March - 6 March"
-            r'(\d{1,2}-\d{1,2} \w+)',                   # "4-6 March"
-            r'Arrives: (\w+, \w+ \d+)',                 # "Arrives: Monday, Mar 4"
-            r'delivery between (\w+ \d+ - \w+ \d+)',    # "delivery between Mar 4 - Mar 6"
-            r'delivery: (\w+, \w+ \d+)'                 # "delivery: Monday, Mar 4"
-        ]
-
-        for pattern in date_patterns:
-            match = re.search(pattern, delivery_text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-
-        # If no pattern matches but contains delivery-related keywords, attempt to extract date portions
-        delivery_keywords = ["delivery", "delivered", "arrive", "get it", "by", "between", "shipped"]
-        if any(keyword in delivery_text.lower() for keyword in delivery_keywords):
-            # Try to extract date-like parts
-            date_parts = re.findall(r'(\d{1,2} \w+|\w+ \d{1,2}|\d{1,2}-\d{1,2} \w+|\w+ \d{1,2} - \w+ \d{1,2})', delivery_text)
-            if date_parts:
-                return date_parts[0].strip()
-
-        return "Unable to parse date"
+        """Parse delivery text into a (start, end) date range resolved against today's date and marketplace locale"""
+        return parse_delivery(delivery_text, scraped_on=datetime.now().date(), marketplace=self.country)
 
     def _extract_description(self, soup):
         """Extract product description from various possible locations"""
@@ -346,113 +627,425 @@ class AmazonScraper:
             "#detailBullets_feature_div"
         ]
 
-        for selector in description_selectors:
+        for selector in self._ordered_selectors("description", description_selectors):
             element = soup.select_one(selector)
             if element and element.get_text(strip=True):
+                self._record_selector("description", selector, True)
                 return element.get_text(strip=True)[:1000]  # Limit description length
+            self._record_selector("description", selector, False)
 
         return "N/A"
 
     def _extract_technical_details(self, soup):
-        """Extract technical details and product information with improved selectors"""
+        """Extract technical details and product information in a single pass over the detail containers"""
         tech_data = {}
+        walked = set()
 
-        # Common table selectors that contain product details
-        table_selectors = [
-            "#productDetails_techSpec_section_1",
-            "#productDetails_techSpec_section_2",
-            "#productDetails_detailBullets_sections1",
-            "#detailBulletsWrapper_feature_div",
-            ".detail-bullets-wrapper",
-            ".prodDetTable",
-            ".a-keyvalue"
-        ]
-
-        # Process detail bullets style
-        detail_bullets = soup.select("#detailBullets_feature_div li .a-list-item, #detailBulletsWrapper_feature_div li .a-list-item")
-        for item in detail_bullets:
-            text = item.get_text(strip=True)
-            if ":" in text:
-                key, value = [part.strip() for part in text.split(":", 1)]
-                # Clean up the key name for better column headers
-                clean_key = re.sub(r'[^a-zA-Z0-9 ]', '', key)
-                clean_key = clean_key.strip().replace(' ', '_')
-                tech_data[f"Tech_{clean_key}"] = value
-
-        # Process all potential table formats
-        for selector in table_selectors:
-            # Try to find the table
-            table = soup.select_one(selector)
-            if not table:
+        for container in soup.select(TECH_DETAIL_CONTAINERS):
+            # Skip containers nested inside one already walked (e.g. a .a-keyvalue techSpec table)
+            if any(id(parent) in walked for parent in container.parents):
                 continue
+            walked.add(id(container))
 
-            # Process rows in the table
-            rows = table.select("tr") or table.select(".a-spacing-small")
-            for row in rows:
-                # Try different selector combinations for header/key and value
-                header = row.select_one("th, .prodDetSectionEntry, .a-span3, .a-color-secondary")
-                value_cell = row.select_one("td, .prodDetAttrValue, .a-span9, .a-span7")
-
-                if header and value_cell:
-                    key = header.get_text(strip=True)
-                    value = value_cell.get_text(strip=True)
-
-                    # Clean up the key name
-                    clean_key = re.sub(r'[^a-zA-Z0-9 ]', '', key)
-                    clean_key = clean_key.strip().replace(' ', '_')
-
-                    # Use a consistent prefix for all technical details
-                    tech_data[f"Tech_{clean_key}"] = value
-
-        # Additional format often used for ASIN, product dimensions, etc.
-        detail_sections = soup.select("#detailBulletsWrapper_feature_div .a-section")
-        for section in detail_sections:
-            section_title = section.select_one("h3")
-            if section_title:
-                section_name = section_title.get_text(strip=True)
-                items = section.select("li span")
-
-                for item in items:
-                    text = item.get_text(strip=True)
-                    if ":" in text:
-                        key, value = [part.strip() for part in text.split(":", 1)]
-                        # Use the section name as part of the key
-                        section_prefix = re.sub(r'[^a-zA-Z0-9 ]', '', section_name)
-                        section_prefix = section_prefix.strip().replace(' ', '_')
-                        clean_key = re.sub(r'[^a-zA-Z0-9 ]', '', key)
-                        clean_key = clean_key.strip().replace(' ', '_')
-                        tech_data[f"Tech_{section_prefix}_{clean_key}"] = value
-
-        # Also try the newer "About this item" format that's in tables
-        about_tables = soup.select(".a-section table.a-keyvalue")
-        for table in about_tables:
-            rows = table.select("tr")
+            rows = container.find_all(["tr", "li"]) or container.select(".a-spacing-small")
             for row in rows:
-                cells = row.select("th, td")
-                if len(cells) >= 2:
-                    key = cells[0].get_text(strip=True)
-                    value = cells[1].get_text(strip=True)
-                    if key and value:
-                        clean_key = re.sub(r'[^a-zA-Z0-9 ]', '', key)
-                        clean_key = clean_key.strip().replace(' ', '_')
-                        tech_data[f"Tech_{clean_key}"] = value
+                key, value = self._split_detail_row(row)
+                if not key or not value:
+                    continue
+                column = self.tech_schema.column(key)
+                # First occurrence wins when synonymous labels appear on the same page
+                if column and column not in tech_data:
+                    tech_data[column] = value
 
         # Log technical details to help troubleshoot
         if tech_data:
-            logging.info(f"Extracted {len(tech_data)} technical details")
+            logging.debug(f"Extracted {len(tech_data)} technical details")
         else:
             logging.warning("No technical details found")
 
         return tech_data
 
-# Initialize Amazon scraper
-amazon_scraper = AmazonScraper(country="in")
+    def _split_detail_row(self, row):
+        """Return (label, value) for a detail bullet ("Label : Value") or a table row"""
+        if row.name == "li":
+            text = row.get_text(strip=True)
+            if ":" not in text:
+                return None, None
+            key, value = text.split(":", 1)
+            return key.strip(), value.strip()
+
+        header = row.select_one("th, .prodDetSectionEntry, .a-span3, .a-color-secondary")
+        value_cell = row.select_one("td, .prodDetAttrValue, .a-span9, .a-span7")
+        if not header or not value_cell or header is value_cell:
+            # Plain two-column rows ("About this item" key/value tables)
+            cells = row.find_all(["th", "td"])
+            if len(cells) < 2:
+                return None, None
+            header, value_cell = cells[0], cells[1]
+        return header.get_text(strip=True), value_cell.get_text(strip=True)
+
+# Shared services, created by init_services() so importing this module has no side effects
+selector_stats = None
+browser_pool = None
+amazon_scraper = None
+offer_scraper = None
+review_scraper = None
+result_store = None
+scrape_flights = None
+watchlist_store = None
+image_downloader = None
+watchlist_scheduler = None
+webhook_dispatcher = None
+scrape_profiler = None
+
+def init_services(config):
+    """Create the scraper and its companion services from app config"""
+    global selector_stats, browser_pool, amazon_scraper, offer_scraper, review_scraper, scrape_profiler, result_store, scrape_flights
+    global watchlist_store, watchlist_scheduler, image_downloader, webhook_dispatcher
+
+    # Selector hit-rate telemetry shared by all scrapers
+    selector_stats = SelectorStats(
+        adaptive=config['ADAPTIVE_SELECTORS'],
+        pinned=config['PINNED_SELECTORS']
+    )
+
+    # Browser tier for tiered fetch (disabled unless BROWSER_FALLBACK is set); selenium is only imported then
+    browser_pool = None
+    if config['BROWSER_FALLBACK']:
+        from browser_pool import BrowserPool
+        browser_pool = BrowserPool(size=config['BROWSER_POOL_SIZE'], driver_path=config['BROWSER_DRIVER_PATH'])
+
+    # Initialize Amazon scraper
+    amazon_scraper = AmazonScraper(
+        country="in",
+        selector_stats=selector_stats,
+        browser_pool=browser_pool,
+        tech_schema=TechSchemaRegistry(config['TECH_SCHEMA_FILE']),
+        base_url=config['AMAZON_BASE_URL'],
+        request_delay=config['REQUEST_DELAY'],
+        debug_html_dir=config['DEBUG_HTML_DIR']
+    )
+    offer_scraper = OfferScraper(amazon_scraper)
+    review_scraper = ReviewScraper(
+        amazon_scraper,
+        output_dir=config['REVIEWS_DIR'],
+        checkpoint_file=os.path.join(config['REVIEWS_DIR'], 'checkpoints.json')
+    )
+    # Scrape results are held here and referenced by ID from the results view and downloads
+    result_store = ResultStore(config['RESULTS_DB'], max_results=config['RESULTS_TO_KEEP'])
+    # Concurrent requests for the same product share one fetch
+    scrape_flights = SingleFlight(timeout=config['COALESCE_TIMEOUT'])
+
+    # Optional image download pipeline (bulk jobs with download_images, /api/images)
+    image_downloader = ImageDownloader(
+        root=config['IMAGES_DIR'],
+        size=config['IMAGE_SIZE'],
+        per_host=config['IMAGE_HOST_CONCURRENCY']
+    )
+
+    # Batched, signed delivery of bulk results to callback URLs
+    webhook_dispatcher = WebhookDispatcher(
+        WebhookOutbox(config['WEBHOOK_OUTBOX']),
+        secret=config['WEBHOOK_SECRET'],
+        batch_size=config['WEBHOOK_BATCH_SIZE'],
+        batch_seconds=config['WEBHOOK_BATCH_SECONDS']
+    )
+
+    # Recurring watchlist scrapes, spread over time within per-marketplace rate budgets
+    watchlist_store = WatchlistStore(config['WATCHLIST_DB'])
+    watchlist_scheduler = None  # Started by start_background_services()
+
+    # Scrapers for other marketplaces (watchlists) are built with the same settings
+    _scraper_options.update(
+        base_url=config['AMAZON_BASE_URL'],
+        request_delay=config['REQUEST_DELAY'],
+        debug_html_dir=config['DEBUG_HTML_DIR']
+    )
+
+    # Opt-in scrape profiler (off unless requested or sampled)
+    scrape_profiler = ScrapeProfiler(
+        profiles_dir=config['PROFILES_DIR'],
+        sample_rate=config['PROFILE_SAMPLE_RATE'],
+        max_profiles=config['PROFILES_TO_KEEP'],
+        max_age=config['PROFILE_MAX_AGE']
+    )
+
+def start_background_services(config):
+    """Start this process's background threads; with a preloaded app, call it in each forked worker"""
+    if webhook_dispatcher.outbox.next_due_in() is not None:
+        # Resume batches left undelivered by a previous run
+        webhook_dispatcher.start()
+
+    if config['WATCHLIST_SCHEDULER']:
+        def start_scheduler():
+            global watchlist_scheduler
+            watchlist_scheduler = WatchlistScheduler(
+                watchlist_store,
+                scrape_watched_product,
+                budgets=config['WATCHLIST_BUDGETS'],
+                default_budget=config['WATCHLIST_DEFAULT_BUDGET']
+            ).start()
+        # Every worker calls this; the lock makes exactly one of them run the scheduler
+        start_when_leader(config['WATCHLIST_DB'] + '.scheduler.lock', start_scheduler)
+
+def _profiling_requested(payload=None):
+    """Check the request flag or header asking for this scrape to be profiled"""
+    truthy = ('1', 'true', 'yes', 'on')
+    if request.headers.get('X-Profile-Scrape', '').lower() in truthy:
+        return True
+    if str(request.form.get('profile', '')).lower() in truthy:
+        return True
+    if payload and str(payload.get('profile', '')).lower() in truthy:
+        return True
+    return False
+
+def scrape_product(asin, profile=False, **kwargs):
+    """Scrape a single ASIN, joining an identical in-flight scrape instead of fetching it again"""
+    family_fields = kwargs.get("family_fields")
+    # Calls with different retry budgets (bulk max_retries=1 vs API default 3) don't share a scrape
+    key = (amazon_scraper.country, asin, resolve_groups(kwargs.get("fields")),
+           frozenset(family_fields) if family_fields else None, kwargs.get("max_retries", 3))
+    return scrape_flights.do(key, _scrape_product, asin, profile=profile, **kwargs)
+
+def _scrape_product(asin, profile=False, **kwargs):
+    """Scrape a single ASIN, wrapping it in the profiler when requested or sampled"""
+    start = time.perf_counter()
+    if scrape_profiler.should_profile(profile):
+        product_data = scrape_profiler.run(asin, amazon_scraper.get_product, asin, **kwargs)
+    else:
+        product_data = amazon_scraper.get_product(asin, **kwargs)
+    logging.info(f"Scrape of {asin} {'succeeded' if product_data else 'failed'}", extra={
+        "asin": asin,
+        "marketplace": amazon_scraper.country,
+        "stage": "scrape",
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1)
+    })
+    return product_data
+
+# Scrapers for marketplaces other than the main one, created on first use by watchlists
+_marketplace_scrapers = {}
+_marketplace_lock = threading.Lock()
+_scraper_options = {}  # base_url / request_delay / debug_html_dir from app config, set by init_services()
+
+def scrape_watched_product(asin, marketplace):
+    """Scrape a watchlist item on its own marketplace"""
+    if marketplace == amazon_scraper.country:
+        return scrape_product(asin)
+    with _marketplace_lock:
+        scraper = _marketplace_scrapers.get(marketplace)
+        if scraper is None:
+            scraper = _marketplace_scrapers[marketplace] = AmazonScraper(
+                country=marketplace,
+                selector_stats=selector_stats,
+                tech_schema=amazon_scraper.tech_schema,
+                **_scraper_options
+            )
+    return scraper.get_product(asin)
+
+# Cap on ASINs per bulk job, whatever the caller asks for
+MAX_BULK_ASINS = 100
+
+def _retry_policy_from_form():
+    """Build a per-job retry policy from optional form fields"""
+    policy = RetryPolicy()
+    try:
+        if request.form.get('max_attempts'):
+            policy.max_attempts = max(1, int(request.form['max_attempts']))
+        if request.form.get('retry_deadline'):
+            policy.deadline = float(request.form['retry_deadline'])
+    except ValueError:
+        logging.warning("Ignoring invalid retry settings in bulk request")
+    return policy
+
+def _form_flag(name):
+    return request.form.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
+def _callback_url(value):
+    """Validated webhook callback URL (http/https), or None when not given"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    parts = urlsplit(value)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        raise ValueError(f"Invalid callback URL: {value}")
+    return value
+
+def _form_fields():
+    """Optional field selection from a form ("price", or comma-separated field names)"""
+    fields = [f.strip() for f in request.form.get('fields', '').split(',') if f.strip()]
+    return fields or None
+
+def attach_offers(product_data):
+    """Scrape all offers for a product and add them (plus a summary) to its record"""
+    offers = offer_scraper.get_offers(product_data["ASIN"])
+    prices = [float(re.sub(r'[^\d.]', '', o["Price"])) for o in offers if re.sub(r'[^\d.]', '', o["Price"])]
+    product_data["Offer Count"] = len(offers)
+    product_data["Lowest Offer Price"] = min(prices) if prices else "N/A"
+    product_data["Offers"] = json.dumps(offers, ensure_ascii=False)
+    return offers
+
+def attach_image_files(products):
+    """Download the images of a batch of products (deduplicated) and record their local paths"""
+    image_urls = {id(p): [u for u in p.get("Image URLs", "").split("\n") if u.startswith("http")] for p in products}
+    paths = image_downloader.download_all(url for urls in image_urls.values() for url in urls)
+
+    updated = []
+    for product in products:
+        files = [paths[url] for url in image_urls[id(product)] if paths.get(url)]
+        if files:
+            product = ProductRecord.from_dict({**product, "Image Files": "\n".join(files)})
+        updated.append(product)
+    logging.info(f"Image downloads: {image_downloader.stats}")
+    return updated
+
+def run_bulk_job(asin_source, max_asins=MAX_BULK_ASINS, profile=False, retry_policy=None,
+                 expand_variations=False, listing_data=None, include_offers=False, fields=None,
+                 download_images=False, callback_url=None, job_id=None):
+    """Scrape ASINs from a list or a stream (e.g. a listing crawl), pulling new ones as work frees up
+
+    listing_data: optional {asin: {...}} of listing-level fields merged into each product.
+    include_offers: also scrape every offer for each product in the same run.
+    fields: only extract these fields/presets (e.g. ["price"]); None extracts everything.
+    download_images: download every product's images into IMAGES_DIR once scraping finishes.
+    callback_url: push products to this URL in signed batches as they complete (see webhooks.py).
+    Products are returned as compact ProductRecords (use .to_dict() for the plain dict shape).
+    """
+    products = []
+    success_count = 0
+    failed_count = 0
+
+    bulk_delay = current_app.config['BULK_REQUEST_DELAY']
+
+    # Failed fetches go to a delayed-retry queue instead of blocking the loop
+    job_id = job_id or uuid.uuid4().hex[:12]
+    retries = RetryScheduler(retry_policy)
+    # Snapshots go to the shared result store, so any worker can answer /api/jobs/<id>/retries
+    result_store.save_retries(job_id, retries.snapshot())
+
+    source = iter(asin_source)
+    pending = deque()
+    accepted = 0
+    requests_made = 0
+
+    # Optionally expand each product to its whole variation family
+    families = VariationFamilyTracker()
+
+    source_done = False
+
+    def next_fresh_asin():
+        """Next ASIN from the expansion queue or the source, skipping duplicates and honouring the cap"""
+        nonlocal accepted, source_done
+        if pending:
+            return pending.popleft()
+        # Once the source is used up or the cap is hit, stop pulling from it (a listing
+        # source would otherwise keep fetching pages nobody will scrape)
+        if source_done:
+            return None
+        # Set a reasonable limit to avoid overwhelming the server
+        while accepted < max_asins:
+            asin = next(source, None)
+            if asin is None:
+                source_done = True
+                return None
+            asin = str(asin).strip()
+            if asin and not families.is_seen(asin):
+                families.mark_seen(asin)
+                accepted += 1
+                return asin
+        source_done = True
+        if next(source, None) is not None:
+            logging.warning(f"Limited bulk scraping to {max_asins} ASINs")
+        return None
 
-@app.route('/')
+    with log_context(job_id=job_id, marketplace=amazon_scraper.country):
+        while True:
+            # Due retries take priority; otherwise move on to fresh ASINs
+            asin = retries.pop_due()
+            if asin is None:
+                asin = next_fresh_asin()
+            if asin is None:
+                if not retries.pending():
+                    break
+                time.sleep(retries.next_due_in() or 0)
+                continue
+
+            try:
+                # Add delay between requests to avoid getting blocked
+                if requests_made > 0:
+                    delay = random.uniform(*bulk_delay)
+                    time.sleep(delay)
+                requests_made += 1
+
+                product_data = scrape_product(asin, profile=profile, max_retries=1,
+                                              family_fields=families.shared_fields(asin), fields=fields)
+                if product_data:
+                    retries.record_success(asin)
+                    if listing_data and asin in listing_data:
+                        product_data.update(listing_data[asin])
+                    if include_offers:
+                        try:
+                            attach_offers(product_data)
+                        except Exception as e:
+                            logging.error(f"Error scraping offers for {asin}: {str(e)}")
+                    products.append(ProductRecord.from_dict(product_data))
+                    success_count += 1
+                    if callback_url:
+                        webhook_dispatcher.add(job_id, callback_url, product_data)
+                    logging.info(f"Successfully scraped {asin} ({success_count}/{accepted})")
+
+                    if expand_variations:
+                        siblings = families.register(product_data)
+                        room = max_asins - accepted
+                        if siblings and room > 0:
+                            siblings = siblings[:room]
+                            accepted += len(siblings)
+                            pending.extend(siblings)
+                            logging.info(f"Expanded {asin} to {len(siblings)} variation sibling(s)")
+                    continue
+                error = amazon_scraper.last_error() or "no product data"
+            except Exception as e:
+                logging.error(f"Error scraping {asin}: {str(e)}")
+                error = str(e)
+
+            if retries.record_failure(asin, error):
+                logging.info(f"Deferred retry for {asin} after failure: {error}")
+            else:
+                failed_count += 1
+                logging.warning(f"Failed to scrape {asin} ({failed_count} failures)")
+            result_store.save_retries(job_id, retries.snapshot())
+
+    result_store.save_retries(job_id, retries.snapshot())
+
+    if download_images and products:
+        with log_context(job_id=job_id, stage="images"):
+            products = attach_image_files(products)
+
+    if callback_url:
+        # Final batch carries whatever is still buffered plus the job summary
+        webhook_dispatcher.finish(job_id, callback_url, summary={
+            "success_count": success_count,
+            "failed_count": failed_count
+        })
+
+    return {
+        "job_id": job_id,
+        "products": products,
+        "success_count": success_count,
+        "failed_count": failed_count
+    }
+
+@bp.after_request
+def compress_api_response(response):
+    """gzip/brotli-encode API responses for clients that accept it"""
+    if request.path.startswith('/api/'):
+        return compress_response(response)
+    return response
+
+@bp.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/scrape_single_product', methods=['POST'])
+@bp.route('/scrape_single_product', methods=['POST'])
 def scrape_single_product():
     if request.method == 'POST':
         try:
@@ -465,13 +1058,13 @@ def scrape_single_product():
             logging.info(f"Scrape request for ASIN: {asin}")
 
             # Get product data using improved scraper
-            product_data = amazon_scraper.get_product(asin)
+            product_data = scrape_product(asin, profile=_profiling_requested())
 
             if product_data:
-                # Store product data in session
-                session['products'] = [product_data]
-                # Pass product_data to the template
-                return render_template("index.html", products=[product_data])
+                # Keep the result server-side; the page loads it from /api/results/<id>
+                result_id = result_store.save([product_data])
+                session['result_id'] = result_id
+                return render_template("index.html", result_id=result_id)
             else:
                 return render_template("index.html", error=f"Could not scrape product with ASIN: {asin}")
 
@@ -482,7 +1075,7 @@ def scrape_single_product():
     else:
         return render_template("index.html", error="Only POST requests are allowed for this route")
 
-@app.route('/scrape_bulk_products', methods=['POST'])
+@bp.route('/scrape_bulk_products', methods=['POST'])
 def scrape_bulk_products():
     if request.method == 'POST':
         try:
@@ -497,7 +1090,8 @@ def scrape_bulk_products():
             if not file.filename.endswith(('.xls', '.xlsx')):
                 return render_template("index.html", error="Invalid file format. Please upload an Excel file (.xls or .xlsx)")
 
-            # Read the Excel file
+            # Read the Excel file (pandas is only imported on export/import paths)
+            import pandas as pd
             try:
                 df = pd.read_excel(file)
             except Exception as e:
@@ -526,41 +1120,25 @@ def scrape_bulk_products():
 
             logging.info(f"Bulk scraping {len(asins)} ASINs")
 
-            # Set a reasonable limit to avoid overwhelming the server
-            max_asins = 100
-            if len(asins) > max_asins:
-                asins = asins[:max_asins]
-                logging.warning(f"Limited bulk scraping to {max_asins} ASINs")
-
-            products = []
-            success_count = 0
-            failed_count = 0
-
-            # Process each ASIN with a delay between requests
-            for i, asin in enumerate(asins):
-                try:
-                    # Add delay between requests to avoid getting blocked
-                    if i > 0:
-                        delay = random.uniform(2, 5)
-                        time.sleep(delay)
-
-                    product_data = amazon_scraper.get_product(asin)
-                    if product_data:
-                        products.append(product_data)
-                        success_count += 1
-                        logging.info(f"Successfully scraped {asin} ({success_count}/{len(asins)})")
-                    else:
-                        failed_count += 1
-                        logging.warning(f"Failed to scrape {asin} ({failed_count} failures)")
-                except Exception as e:
-                    failed_count += 1
-                    logging.error(f"Error scraping {asin}: {str(e)}")
-
-            # Store products in session
-            session['products'] = products
-
-            if products:
-                return render_template('index.html', products=products, success_count=success_count, failed_count=failed_count)
+            job = run_bulk_job(
+                asins,
+                profile=_profiling_requested(),
+                retry_policy=_retry_policy_from_form(),
+                expand_variations=_form_flag('expand_variations'),
+                include_offers=_form_flag('include_offers'),
+                fields=_form_fields(),
+                download_images=_form_flag('download_images'),
+                callback_url=_callback_url(request.form.get('callback_url'))
+            )
+            success_count = job["success_count"]
+            failed_count = job["failed_count"]
+            job_id = job["job_id"]
+
+            if job["products"]:
+                # Results are paged in from /api/results/<job_id> so the page stays small for any batch size
+                result_id = result_store.save(job["products"], result_id=job_id)
+                session['result_id'] = result_id
+                return render_template('index.html', result_id=result_id, success_count=success_count, failed_count=failed_count, job_id=job_id)
             else:
                 return render_template("index.html", error="Failed to scrape any products")
 
@@ -571,43 +1149,99 @@ def scrape_bulk_products():
     else:
         return render_template("index.html", error="Only POST requests are allowed for this route")
 
-def remove_control_characters(s):
-    """Remove control characters from string"""
-    return re.sub(r'[\x00-\x1F\x7F-\x9F]', '', s)
+@bp.route('/scrape_listing', methods=['POST'])
+def scrape_listing():
+    """Discover ASINs from a search query or category/bestseller URL and stream them into a bulk job"""
+    try:
+        query = request.form.get('query', '').strip()
+        listing_url = request.form.get('listing_url', '').strip()
+        if not query and not listing_url:
+            return render_template("index.html", error="Please enter a search query or listing URL")
 
-@app.route('/download_excel', methods=['POST'])
-def download_excel():
+        try:
+            max_pages = max(1, min(int(request.form.get('max_pages') or 5), 20))
+        except ValueError:
+            return render_template("index.html", error="Max pages must be a number")
+
+        crawler = ListingCrawler(amazon_scraper)
+        listing_data = {}
+
+        def discovered_asins():
+            # ASINs are handed to the bulk job as soon as each listing page is parsed
+            for item in crawler.crawl(query=query or None, url=listing_url or None, max_pages=max_pages):
+                asin = item.pop("ASIN")
+                listing_data.setdefault(asin, item)
+                yield asin
+
+        logging.info(f"Listing crawl for {query or listing_url} ({max_pages} pages)")
+        job = run_bulk_job(
+            discovered_asins(),
+            profile=_profiling_requested(),
+            retry_policy=_retry_policy_from_form(),
+            expand_variations=_form_flag('expand_variations'),
+            listing_data=listing_data,
+            include_offers=_form_flag('include_offers'),
+            fields=_form_fields()
+        )
+
+        if job["products"]:
+            result_id = result_store.save(job["products"], result_id=job["job_id"])
+            session['result_id'] = result_id
+            return render_template('index.html', result_id=result_id, success_count=job["success_count"],
+                                   failed_count=job["failed_count"], job_id=job["job_id"])
+        return render_template("index.html", error="Failed to scrape any products from the listing")
+
+    except Exception as e:
+        logging.error(f"Error in scrape_listing: {str(e)}")
+        logging.error(traceback.format_exc())
+        return render_template("index.html", error=f"An error occurred: {str(e)}")
+
+@bp.route('/api/results/<result_id>', methods=['GET'])
+def api_results(result_id):
+    """One page of a stored result set, filtered (q) and sorted (sort, order) server-side"""
     try:
-        # Get the list of products from the session
-        products = session.get('products', [])
+        page = int(request.args.get('page', 1))
+        per_page = max(1, min(int(request.args.get('per_page', current_app.config['RESULTS_PAGE_SIZE'])), 200))
+    except ValueError:
+        return jsonify({"success": False, "error": "page and per_page must be numbers"}), 400
+
+    result = result_store.page(
+        result_id,
+        page=page,
+        per_page=per_page,
+        sort=request.args.get('sort'),
+        order=request.args.get('order', 'asc'),
+        query=request.args.get('q', '').strip()
+    )
+    if result is None:
+        return jsonify({"success": False, "error": "Unknown or expired result ID"}), 404
+    return api_response({"success": True, **result})
+
+@bp.route('/download_excel', methods=['POST'])
+def download_excel():
+    # Imported here so workers that never export don't pay for pandas at start-up
+    import pandas as pd
 
-        if not products:
-            # If no products in session, check if any were passed in the form
-            if 'products' in request.form:
-                try:
-                    products_json = request.form.get('products')
-                    products_json = html.unescape(products_json)
-                    products_json = remove_control_characters(products_json)
-                    products = json.loads(products_json)
-                except json.JSONDecodeError as e:
-                    logging.error(f"JSON Decode Error: {str(e)}")
-                    return render_template("index.html", error=f"Error processing JSON data: {str(e)}")
-
-        # Make sure we have a list of products, even if only one product is passed
-        if not isinstance(products, list):
-            products = [products]
+    try:
+        # Results are referenced by ID (form field, else the last result in this session)
+        result_id = request.form.get('result_id') or session.get('result_id')
+        products = result_store.get(result_id) if result_id else None
+        if products is None:
+            return render_template("index.html", error="These results have expired; please scrape again")
 
         if products:
-            # Log technical details keys for debugging
-            for product in products:
-                tech_keys = [k for k in product.keys() if k.startswith('Tech_')]
-                if tech_keys:
-                    logging.info(f"Technical details found for ASIN {product.get('ASIN', 'Unknown')}: {tech_keys}")
-                else:
-                    logging.warning(f"No technical details found for ASIN {product.get('ASIN', 'Unknown')}")
+            # Log technical details keys for debugging (sampled debug lines, skipped entirely unless enabled)
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                for product in products:
+                    tech_keys = [k for k in product.keys() if k.startswith('Tech_')]
+                    logging.debug(f"Technical details for ASIN {product.get('ASIN', 'Unknown')}: {tech_keys or 'none'}")
+
+            # Convert to DataFrame column-wise (no intermediate per-row dicts)
+            df = pd.DataFrame(product_columns(products))
 
-            # Convert to DataFrame
-            df = pd.DataFrame(products)
+            # Typed price/currency columns for the whole batch in one vectorized pass
+            from normalize import normalize_prices, NORMALIZED_COLUMNS
+            df = normalize_prices(df, default_marketplace=amazon_scraper.country)
 
             # Find bullet point columns
             bullet_point_cols = [col for col in df.columns if col.startswith('Bullet Point ')]
@@ -636,10 +1270,21 @@ def download_excel():
                 "Current Price",
                 "Original Price (MRP)",
                 "Discount Percentage",
+            ])
+            column_order.extend(NORMALIZED_COLUMNS)
+            column_order.extend([
+                "Availability",
                 "Delivery Date Raw",
                 "Delivery Date Parsed",
+                "Delivery Start",
+                "Delivery End",
             ])
 
+            # Real date cells in the export so the sheet can be sorted and filtered by delivery date
+            for column in ("Delivery Start", "Delivery End"):
+                if column in df.columns:
+                    df[column] = pd.to_datetime(df[column], errors="coerce").dt.date
+
             # Add technical detail columns
             column_order.extend(sorted(tech_detail_cols))
 
@@ -669,6 +1314,7 @@ def download_excel():
                 "Current Price",
                 "Original Price (MRP)",
                 "Discount Percentage",
+                "Availability",
                 "Delivery Date Raw",
                 "Delivery Date Parsed",
                 "URL"
@@ -677,9 +1323,18 @@ def download_excel():
         # Create an in-memory Excel file
         excel_buffer = io.BytesIO()
 
+        # Offers (if scraped) go to their own sheet, one row per offer
+        offers_df = None
+        if "Offers" in df.columns:
+            offers = [offer for cell in df["Offers"].dropna() for offer in json.loads(cell)]
+            offers_df = pd.DataFrame(offers)
+            df = df.drop(columns=["Offers"])
+
         # Use ExcelWriter for more control
         with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
              df.to_excel(writer, index=False, sheet_name='Product Data')
+             if offers_df is not None and not offers_df.empty:
+                 offers_df.to_excel(writer, index=False, sheet_name='Offers')
 
         # Important: Move pointer to beginning of buffer
         excel_buffer.seek(0)
@@ -698,7 +1353,7 @@ def download_excel():
         logging.error(traceback.format_exc())
         return render_template("index.html", error=f"Error processing the download request: {str(e)}")
 
-@app.route('/api/scrape', methods=['POST'])
+@bp.route('/api/scrape', methods=['POST'])
 def api_scrape():
     """API endpoint for scraping product data"""
     try:
@@ -710,27 +1365,365 @@ def api_scrape():
         if not asin:
             return jsonify({"error": "Empty ASIN provided"}), 400
 
-        product_data = amazon_scraper.get_product(asin)
+        # Only the extractors for the requested fields run; the response is projected to the same fields
+        fields = requested_fields(data)
+        product_data = scrape_product(asin, profile=_profiling_requested(data), fields=fields)
         if product_data:
-            return jsonify({"success": True, "data": product_data})
+            return api_response({"success": True, "data": product_data}, fields=fields)
         else:
             return jsonify({"success": False, "error": "Failed to scrape product"}), 404
 
+    except CoalescedScrapeTimeout as e:
+        logging.warning(f"API timeout: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 504
+    except Exception as e:
+        logging.error(f"API error: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+_job_broker = None
+
+def get_job_broker():
+    """Open the shared job broker on first use"""
+    global _job_broker
+    if _job_broker is None:
+        _job_broker = open_broker(current_app.config['BROKER_URL'])
+    return _job_broker
+
+@bp.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """Queue ASINs on the shared broker for distributed workers (see worker.py)"""
+    try:
+        data = request.get_json()
+        if not data or not data.get('asins'):
+            return jsonify({"error": "No ASINs provided"}), 400
+
+        asins = [str(asin).strip() for asin in data['asins'] if str(asin).strip()]
+        asins = list(dict.fromkeys(asins))  # Remove duplicates while preserving order
+        if not asins:
+            return jsonify({"error": "No valid ASINs provided"}), 400
+
+        job_id = uuid.uuid4().hex[:12]
+        payload = {}
+        fields = requested_fields(data)
+        if fields:
+            payload["fields"] = fields
+        callback_url = _callback_url(data.get('callback_url'))
+        if callback_url:
+            # Workers push their results to this URL in signed batches (see worker.py --webhook-secret)
+            payload["callback_url"] = callback_url
+        queued = get_job_broker().enqueue(job_id, asins, payload=payload or None)
+        logging.info(f"Queued distributed job {job_id} with {queued} ASINs")
+        return jsonify({"success": True, "job_id": job_id, "queued": queued}), 202
+
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"API error: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@bp.route('/api/bulk', methods=['POST'])
+def api_bulk_job():
+    """Run a bulk job in the background and push its results to callback_url in batches"""
+    try:
+        data = request.get_json()
+        if not data or not data.get('asins'):
+            return jsonify({"error": "No ASINs provided"}), 400
+        callback_url = _callback_url(data.get('callback_url'))
+        if not callback_url:
+            return jsonify({"error": "No callback_url provided"}), 400
+
+        asins = [str(asin).strip() for asin in data['asins'] if str(asin).strip()]
+        asins = list(dict.fromkeys(asins))  # Remove duplicates while preserving order
+        if not asins:
+            return jsonify({"error": "No valid ASINs provided"}), 400
+
+        job_id = uuid.uuid4().hex[:12]
+        options = {
+            "max_asins": max(1, min(int(data.get('max_asins', MAX_BULK_ASINS)), MAX_BULK_ASINS)),
+            "expand_variations": bool(data.get('expand_variations')),
+            "include_offers": bool(data.get('include_offers')),
+            "fields": requested_fields(data),
+            "callback_url": callback_url,
+            "job_id": job_id
+        }
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                try:
+                    job = run_bulk_job(asins, **options)
+                    if job["products"]:
+                        result_store.save(job["products"], result_id=job_id)
+                except Exception as e:
+                    logging.error(f"Bulk job {job_id} failed: {str(e)}")
+                    logging.error(traceback.format_exc())
+
+        threading.Thread(target=run, name=f"bulk-{job_id}", daemon=True).start()
+        logging.info(f"Started bulk job {job_id} with {len(asins)} ASINs, delivering to {callback_url}")
+        return jsonify({"success": True, "job_id": job_id, "queued": len(asins)}), 202
+
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"API error: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@bp.route('/api/webhooks/<job_id>', methods=['GET'])
+def api_webhook_status(job_id):
+    """Callback batch counts for a job by delivery status (pending, delivered, failed)"""
+    batches = webhook_dispatcher.outbox.job_status(job_id)
+    if not batches:
+        return jsonify({"success": False, "error": "No callback batches for this job"}), 404
+    return jsonify({"success": True, "job_id": job_id, "batches": batches, "dispatcher": webhook_dispatcher.snapshot()})
+
+@bp.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job_results(job_id):
+    """Status counts and collected results of a distributed job"""
+    try:
+        broker = get_job_broker()
+        status = broker.job_status(job_id)
+        if not status:
+            return jsonify({"success": False, "error": "Unknown job ID"}), 404
+        products, failures = broker.results(job_id)
+        return api_response({"success": True, "job_id": job_id, "status": status, "data": products, "failures": failures})
+
     except Exception as e:
         logging.error(f"API error: {str(e)}")
         return jsonify({"success": False, "error": str(e)}), 500
 
-@app.errorhandler(413)
+@bp.route('/api/jobs/<job_id>/retries', methods=['GET'])
+def api_job_retries(job_id):
+    """Per-ASIN retry history for a bulk job"""
+    retries = result_store.get_retries(job_id)
+    if retries is None:
+        return jsonify({"success": False, "error": "Unknown job ID"}), 404
+    return jsonify({"success": True, "job_id": job_id, **retries})
+
+@bp.route('/api/profiles/slowest', methods=['GET'])
+def api_slowest_profiles():
+    """List the slowest recently profiled scrapes"""
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify({"success": True, "profiles": scrape_profiler.slowest(limit)})
+
+@bp.route('/api/offers', methods=['POST'])
+def api_offers():
+    """API endpoint for scraping every offer on an ASIN"""
+    try:
+        data = request.get_json()
+        if not data or 'asin' not in data:
+            return jsonify({"error": "No ASIN provided"}), 400
+
+        asin = data['asin'].strip()
+        if not asin:
+            return jsonify({"error": "Empty ASIN provided"}), 400
+
+        offers = offer_scraper.get_offers(asin)
+        return api_response({"success": True, "asin": asin, "offers": offers})
+
+    except Exception as e:
+        logging.error(f"API error: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@bp.route('/api/images', methods=['POST'])
+def api_images():
+    """Download a product's images (or a given list of Amazon image CDN URLs) into the image store"""
+    try:
+        data = request.get_json()
+        if not data or not (data.get('asin') or data.get('urls')):
+            return jsonify({"error": "No ASIN or image URLs provided"}), 400
+
+        urls = data.get('urls')
+        if urls:
+            if not isinstance(urls, list):
+                return jsonify({"error": "urls must be a list"}), 400
+            # Only Amazon's image CDN - anything else would let clients make this server fetch arbitrary URLs
+            rejected = [u for u in urls if not isinstance(u, str) or not is_image_cdn_url(u)]
+            if rejected:
+                return jsonify({"error": "Only https URLs on Amazon's image CDN are accepted", "rejected": rejected}), 400
+        else:
+            asin = str(data['asin']).strip()
+            product_data = scrape_product(asin, fields=["images"])
+            if not product_data:
+                return jsonify({"success": False, "error": "Failed to scrape product"}), 404
+            urls = [u for u in product_data.get("Image URLs", "").split("\n") if u]
+
+        files = image_downloader.download_all(urls)
+        return api_response({"success": True, "files": files, "stats": dict(image_downloader.stats)})
+
+    except Exception as e:
+        logging.error(f"API error: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+# Upper bound on review pages per ASIN for one /api/reviews request
+MAX_REVIEW_PAGES = 100
+
+@bp.route('/api/reviews', methods=['POST'])
+def api_reviews():
+    """Stream reviews for one or more ASINs as NDJSON while also appending them to REVIEWS_DIR/<asin>.ndjson"""
+    data = request.get_json()
+    if not data or not (data.get('asins') or data.get('asin')):
+        return jsonify({"error": "No ASIN provided"}), 400
+
+    asins = data.get('asins') or [data['asin']]
+    if not isinstance(asins, list):
+        return jsonify({"error": "asins must be a list"}), 400
+    asins = list(dict.fromkeys(str(asin).strip() for asin in asins if str(asin).strip()))
+    if not asins:
+        return jsonify({"error": "No valid ASINs provided"}), 400
+    # ASINs become file names and URL paths, so anything but a plain 10-character ASIN is refused
+    invalid = [asin for asin in asins if not ASIN_RE.match(asin)]
+    if invalid:
+        return jsonify({"error": "Invalid ASINs", "invalid": invalid}), 400
+
+    # Checked before streaming starts - errors inside the generator would come after the 200
+    max_pages = data.get('max_pages')
+    if max_pages is not None:
+        try:
+            max_pages = int(max_pages)
+        except (TypeError, ValueError):
+            return jsonify({"error": "max_pages must be an integer"}), 400
+        if not 1 <= max_pages <= MAX_REVIEW_PAGES:
+            return jsonify({"error": f"max_pages must be between 1 and {MAX_REVIEW_PAGES}"}), 400
+    incremental = bool(data.get('incremental', False))
+
+    def generate():
+        for review in review_scraper.stream_many(asins, max_pages=max_pages, incremental=incremental):
+            yield json.dumps(review, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@bp.route('/api/watchlists', methods=['GET'])
+def api_watchlists():
+    """Watchlists with item counts, plus scheduler counters if it runs in this process"""
+    return jsonify({
+        "success": True,
+        "watchlists": watchlist_store.watchlists(),
+        "scheduler": watchlist_scheduler.snapshot() if watchlist_scheduler else None
+    })
+
+@bp.route('/api/watchlists/<name>', methods=['GET'])
+def api_watchlist_items(name):
+    """Items of a watchlist with their schedule and latest result"""
+    items = watchlist_store.items(name)
+    if not items:
+        return jsonify({"success": False, "error": "Unknown watchlist"}), 404
+    return api_response({"success": True, "watchlist": name, "items": items})
+
+@bp.route('/api/watchlists/<name>', methods=['POST'])
+def api_watchlist_add(name):
+    """Add ASINs to a watchlist with a refresh interval (minutes) and priority"""
+    try:
+        data = request.get_json()
+        if not data or not data.get('asins'):
+            return jsonify({"error": "No ASINs provided"}), 400
+
+        asins = [str(asin).strip() for asin in data['asins'] if str(asin).strip()]
+        asins = list(dict.fromkeys(asins))  # Remove duplicates while preserving order
+        if not asins:
+            return jsonify({"error": "No valid ASINs provided"}), 400
+
+        interval_minutes = float(data.get('interval_minutes', 24 * 60))
+        if interval_minutes < 1:
+            return jsonify({"error": "interval_minutes must be at least 1"}), 400
+
+        # Only known marketplaces - the value becomes part of the amazon.<tld> URL that gets fetched
+        from normalize import MARKETPLACE_FORMATS
+        marketplace = data.get('marketplace', amazon_scraper.country)
+        if marketplace not in MARKETPLACE_FORMATS:
+            return jsonify({"error": f"Unknown marketplace: {marketplace}"}), 400
+
+        added = watchlist_store.add(
+            name,
+            asins,
+            interval=interval_minutes * 60,
+            priority=int(data.get('priority', 0)),
+            marketplace=marketplace
+        )
+        logging.info(f"Watchlist {name}: added/updated {added} ASINs every {interval_minutes} minutes")
+        return jsonify({"success": True, "watchlist": name, "added": added}), 201
+
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": f"Invalid watchlist settings: {str(e)}"}), 400
+    except Exception as e:
+        logging.error(f"API error: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@bp.route('/api/watchlists/<name>', methods=['DELETE'])
+def api_watchlist_remove(name):
+    """Remove some ASINs (JSON body {"asins": [...]}) or the whole watchlist"""
+    data = request.get_json(silent=True) or {}
+    removed = watchlist_store.remove(name, data.get('asins'))
+    return jsonify({"success": True, "watchlist": name, "removed": removed})
+
+@bp.route('/api/fetch/stats', methods=['GET'])
+def api_fetch_stats():
+    """HTTP vs browser tier counters, escalation rate and coalesced (shared in-flight) scrapes"""
+    return jsonify({
+        "success": True,
+        "browser_fallback": browser_pool is not None,
+        "stats": amazon_scraper.get_fetch_stats(),
+        "coalescing": scrape_flights.snapshot()
+    })
+
+@bp.route('/api/selectors/stats', methods=['GET'])
+def api_selector_stats():
+    """Per-marketplace selector hit/miss counters, plus current ordering settings"""
+    marketplace = request.args.get('marketplace')
+    return jsonify({
+        "success": True,
+        "adaptive": selector_stats.adaptive,
+        "pinned": selector_stats.pinned,
+        "stats": selector_stats.snapshot(marketplace)
+    })
+
+@bp.app_errorhandler(413)
 def request_entity_too_large(error):
     return render_template("index.html", error="File too large. Please upload a smaller file."), 413
 
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def page_not_found(error):
     return render_template("index.html", error="Page not found"), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_server_error(error):
     return render_template("index.html", error="Internal server error"), 500
 
+@bp.route('/api/health', methods=['GET'])
+def api_health():
+    """Liveness check that also reports start-up time and whether pandas has been loaded"""
+    return jsonify({
+        "success": True,
+        "pid": os.getpid(),
+        "startup_seconds": current_app.config.get('STARTUP_SECONDS'),
+        "pandas_loaded": 'pandas' in sys.modules
+    })
+
+def create_app(config=None):
+    """Application factory for the dev server and production WSGI servers (see wsgi.py)"""
+    app = Flask(__name__)
+    app.config.update(DEFAULT_CONFIG)
+    if config:
+        app.config.update(config)
+
+    # Create the log file's directory and debug_html if they don't exist
+    for directory in (os.path.dirname(app.config['LOG_FILE']), app.config['DEBUG_HTML_DIR']):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # Configure logging - records are queued and written (as rotated JSON lines) on a background thread
+    configure_logging(app.config['LOG_FILE'], rotate=app.config['LOG_ROTATE'])
+
+    init_services(app.config)
+    if app.config['START_BACKGROUND_SERVICES']:
+        start_background_services(app.config)
+    app.register_blueprint(bp)
+
+    app.config['STARTUP_SECONDS'] = round(time.perf_counter() - _import_started, 3)
+    logging.info(f"App ready in {app.config['STARTUP_SECONDS']}s (pid {os.getpid()})")
+    return app
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,358 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+try:
+    import redis
+except ImportError:  # Redis is optional - the SQLite broker works without it
+    redis = None
+
+
+class SQLiteBroker:
+    """File-based job broker with leasing, heartbeats and re-delivery of expired leases"""
+
+    def __init__(self, path="broker.db", max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    job_id TEXT NOT NULL,
+                    asin TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_job ON tasks (job_id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS finished_jobs (job_id TEXT PRIMARY KEY, finished REAL NOT NULL)")
+
+    def _conn(self):
+        # One connection per thread; sqlite3 connections can't be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return _Transaction(conn)
+
+    def enqueue(self, job_id, asins, payload=None):
+        """Queue one task per ASIN for a job"""
+        now = time.time()
+        rows = [
+            (uuid.uuid4().hex, job_id, asin, json.dumps(payload or {}), self.max_attempts, now, now)
+            for asin in asins
+        ]
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO tasks (id, job_id, asin, payload, max_attempts, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def lease(self, worker_id, lease_seconds=60):
+        """Lease the next available task (queued, or leased by a worker whose lease expired)"""
+        now = time.time()
+        with self._conn() as conn:
+            # Tasks whose lease expired after their last allowed attempt are given up
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', error = 'lease expired', updated = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                "SELECT * FROM tasks WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY created LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] == 'leased':
+                logging.warning(f"Re-delivering task {row['id']} (ASIN {row['asin']}) from expired worker {row['worker_id']}")
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', worker_id = ?, lease_expires = ?, attempts = attempts + 1, updated = ? "
+                "WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"])
+            )
+        return {
+            "id": row["id"],
+            "job_id": row["job_id"],
+            "asin": row["asin"],
+            "payload": json.loads(row["payload"] or "{}"),
+            "attempt": row["attempts"] + 1
+        }
+
+    def heartbeat(self, task_id, worker_id, lease_seconds=60):
+        """Extend a lease; returns False if the task is no longer leased by this worker"""
+        now = time.time()
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated = ? WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (now + lease_seconds, now, task_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id, worker_id, result):
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, lease_expires = NULL, updated = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (json.dumps(result), time.time(), task_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, task_id, worker_id, error, requeue=True):
+        """Release a failed task back to the queue, or mark it failed once out of attempts"""
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                "error = ?, worker_id = NULL, lease_expires = NULL, updated = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (1 if requeue else 0, error, time.time(), task_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def job_status(self, job_id):
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS n FROM tasks WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def claim_finished(self, job_id):
+        """True exactly once, for the first caller after every task of the job is done or failed"""
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS n FROM tasks WHERE job_id = ? AND status IN ('queued', 'leased')", (job_id,)
+            ).fetchone()
+            if row["n"]:
+                return False
+            cursor = conn.execute("INSERT OR IGNORE INTO finished_jobs (job_id, finished) VALUES (?, ?)",
+                                  (job_id, time.time()))
+        return cursor.rowcount == 1
+
+    def results(self, job_id):
+        """Completed results and failures for a job"""
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT asin, status, result, error FROM tasks WHERE job_id = ? AND status IN ('done', 'failed') ORDER BY created",
+                (job_id,)
+            ).fetchall()
+        products, failures = [], []
+        for row in rows:
+            if row["status"] == 'done':
+                products.append(json.loads(row["result"]))
+            else:
+                failures.append({"asin": row["asin"], "error": row["error"]})
+        return products, failures
+
+
+class _Transaction:
+    """Run a block inside BEGIN IMMEDIATE so leasing is atomic across processes"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# KEYS: queue, leases; ARGV: task key prefix, worker_id, lease expiry
+_LEASE_LUA = """
+local task_id = redis.call('RPOP', KEYS[1])
+if not task_id then return nil end
+local key = ARGV[1] .. task_id
+redis.call('ZADD', KEYS[2], ARGV[3], task_id)
+redis.call('HSET', key, 'status', 'leased', 'worker_id', ARGV[2])
+redis.call('HINCRBY', key, 'attempts', 1)
+local reply = redis.call('HGETALL', key)
+table.insert(reply, 1, task_id)
+return reply
+"""
+
+# KEYS: leases, queue; ARGV: task key prefix, now, default max_attempts. Returns re-queued task ids.
+_RECLAIM_LUA = """
+local requeued = {}
+for _, task_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], 0, ARGV[2])) do
+    redis.call('ZREM', KEYS[1], task_id)
+    local key = ARGV[1] .. task_id
+    local attempts = tonumber(redis.call('HGET', key, 'attempts')) or 0
+    local max_attempts = tonumber(redis.call('HGET', key, 'max_attempts')) or tonumber(ARGV[3])
+    if attempts >= max_attempts then
+        redis.call('HSET', key, 'status', 'failed', 'error', 'lease expired')
+    else
+        redis.call('HSET', key, 'status', 'queued')
+        redis.call('RPUSH', KEYS[2], task_id)
+        table.insert(requeued, task_id)
+    end
+end
+return requeued
+"""
+
+# Prefix for the scripts below. KEYS[1]: task hash; ARGV[1]: task id, ARGV[2]: worker id.
+_OWNED = """
+if redis.call('HGET', KEYS[1], 'worker_id') ~= ARGV[2] or redis.call('HGET', KEYS[1], 'status') ~= 'leased' then
+    return 0
+end
+"""
+
+# KEYS: task, leases; ARGV: task_id, worker_id, lease expiry
+_HEARTBEAT_LUA = """
+redis.call('ZADD', KEYS[2], 'XX', ARGV[3], ARGV[1])
+return 1
+"""
+
+# KEYS: task, leases; ARGV: task_id, worker_id, result JSON
+_COMPLETE_LUA = """
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HSET', KEYS[1], 'status', 'done', 'result', ARGV[3])
+return 1
+"""
+
+# KEYS: task, leases, queue; ARGV: task_id, worker_id, error, requeue (1/0), default max_attempts
+_FAIL_LUA = """
+redis.call('ZREM', KEYS[2], ARGV[1])
+local attempts = tonumber(redis.call('HGET', KEYS[1], 'attempts')) or 0
+local max_attempts = tonumber(redis.call('HGET', KEYS[1], 'max_attempts')) or tonumber(ARGV[5])
+if ARGV[4] == '1' and attempts < max_attempts then
+    redis.call('HSET', KEYS[1], 'status', 'queued', 'error', ARGV[3], 'worker_id', '')
+    redis.call('LPUSH', KEYS[3], ARGV[1])
+else
+    redis.call('HSET', KEYS[1], 'status', 'failed', 'error', ARGV[3])
+end
+return 1
+"""
+
+
+class RedisBroker:
+    """Redis-backed job broker with the same interface as SQLiteBroker"""
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="amzscrape", max_attempts=3):
+        if redis is None:
+            raise ImportError("The redis package is required for a redis:// broker URL")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+        # Lease state changes run as Lua scripts so the ownership check and the writes are atomic
+        self._lease_script = self.client.register_script(_LEASE_LUA)
+        self._reclaim_script = self.client.register_script(_RECLAIM_LUA)
+        self._heartbeat_script = self.client.register_script(_OWNED + _HEARTBEAT_LUA)
+        self._complete_script = self.client.register_script(_OWNED + _COMPLETE_LUA)
+        self._fail_script = self.client.register_script(_OWNED + _FAIL_LUA)
+
+    def _key(self, *parts):
+        return ":".join((self.prefix,) + parts)
+
+    def enqueue(self, job_id, asins, payload=None):
+        pipe = self.client.pipeline()
+        for asin in asins:
+            task_id = uuid.uuid4().hex
+            pipe.hset(self._key("task", task_id), mapping={
+                "job_id": job_id,
+                "asin": asin,
+                "payload": json.dumps(payload or {}),
+                "status": "queued",
+                "attempts": 0,
+                "max_attempts": self.max_attempts
+            })
+            pipe.sadd(self._key("job", job_id), task_id)
+            pipe.lpush(self._key("queue"), task_id)
+        pipe.execute()
+        return len(asins)
+
+    def _reclaim_expired(self, now):
+        # One script call, so a task is never both re-queued and still leased
+        for task_id in self._reclaim_script(keys=[self._key("leases"), self._key("queue")],
+                                            args=[self._key("task", ""), now, self.max_attempts]):
+            logging.warning(f"Re-delivering task {task_id} from an expired worker lease")
+
+    def lease(self, worker_id, lease_seconds=60):
+        now = time.time()
+        self._reclaim_expired(now)
+        # Pop, lease and mark the task in one atomic script - a worker dying mid-way can't lose it
+        reply = self._lease_script(keys=[self._key("queue"), self._key("leases")],
+                                   args=[self._key("task", ""), worker_id, now + lease_seconds])
+        if not reply:
+            return None
+        task_id, fields = reply[0], reply[1:]
+        task = dict(zip(fields[::2], fields[1::2]))
+        return {
+            "id": task_id,
+            "job_id": task["job_id"],
+            "asin": task["asin"],
+            "payload": json.loads(task.get("payload") or "{}"),
+            "attempt": int(task["attempts"])
+        }
+
+    def heartbeat(self, task_id, worker_id, lease_seconds=60):
+        """Extend a lease; returns False if the task is no longer leased by this worker"""
+        return bool(self._heartbeat_script(keys=[self._key("task", task_id), self._key("leases")],
+                                           args=[task_id, worker_id, time.time() + lease_seconds]))
+
+    def complete(self, task_id, worker_id, result):
+        return bool(self._complete_script(keys=[self._key("task", task_id), self._key("leases")],
+                                          args=[task_id, worker_id, json.dumps(result)]))
+
+    def fail(self, task_id, worker_id, error, requeue=True):
+        """Release a failed task back to the queue, or mark it failed once out of attempts"""
+        return bool(self._fail_script(keys=[self._key("task", task_id), self._key("leases"), self._key("queue")],
+                                      args=[task_id, worker_id, error, 1 if requeue else 0, self.max_attempts]))
+
+    def _job_tasks(self, job_id):
+        task_ids = sorted(self.client.smembers(self._key("job", job_id)))
+        pipe = self.client.pipeline()
+        for task_id in task_ids:
+            pipe.hgetall(self._key("task", task_id))
+        return pipe.execute()
+
+    def job_status(self, job_id):
+        status = {}
+        for task in self._job_tasks(job_id):
+            status[task.get("status")] = status.get(task.get("status"), 0) + 1
+        return status
+
+    def claim_finished(self, job_id):
+        """True exactly once, for the first caller after every task of the job is done or failed"""
+        status = self.job_status(job_id)
+        if not status or status.get("queued") or status.get("leased"):
+            return False
+        # Each worker checks after its own completion, so the last one always sees the job finished;
+        # SETNX picks a single winner when several see it at once
+        return bool(self.client.set(self._key("finished", job_id), time.time(), nx=True))
+
+    def results(self, job_id):
+        products, failures = [], []
+        for task in self._job_tasks(job_id):
+            if task.get("status") == "done":
+                products.append(json.loads(task["result"]))
+            elif task.get("status") == "failed":
+                failures.append({"asin": task.get("asin"), "error": task.get("error")})
+        return products, failures
+
+
+def open_broker(url):
+    """Open a broker from a URL: sqlite:///path/to/broker.db or redis://host:port/db"""
+    if url.startswith("sqlite:///"):
+        return SQLiteBroker(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported broker URL: {url}")
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    from selenium import webdriver
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+except ImportError:  # Selenium is only needed for the browser-based scraper
+    webdriver = None
+
+# Heavy resources that product scraping never reads
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css",
+    "*.mp4", "*.webm", "*.m3u8"
+]
+
+# Elements scrape_amazon_product reads - we wait for the title, then give the buy box a moment
+CAPTCHA_SELECTOR = "form[action*='validateCaptcha']"
+READY_SELECTORS = ["#productTitle", CAPTCHA_SELECTOR]
+PRICE_SELECTORS = ["span.a-price-whole", "#availability", "#outOfStock"]
+
+
+class BrowserPageBlocked(Exception):
+    """The browser got a CAPTCHA or a page that never showed the product"""
+
+
+def build_chrome_options():
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--log-level=3")
+    # Don't wait for every subresource - we poll for the elements we need instead
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.media_stream": 2
+    })
+    return options
+
+
+def wait_for_product(driver, timeout=10, price_timeout=2):
+    """Wait until the product title (or a CAPTCHA form) is present instead of sleeping a fixed time"""
+    def any_present(selectors):
+        return lambda d: any(d.find_elements(By.CSS_SELECTOR, selector) for selector in selectors)
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(any_present(READY_SELECTORS))
+    except TimeoutException:
+        logging.warning("Timed out waiting for product title")
+        return False
+
+    try:
+        WebDriverWait(driver, price_timeout, poll_frequency=0.1).until(any_present(PRICE_SELECTORS))
+    except TimeoutException:
+        pass  # Not every page has a price block; the title is enough to parse
+    return True
+
+
+class BrowserPool:
+    """Pool of warm headless Chrome drivers, recycled after a number of pages or on crash"""
+
+    def __init__(self, size=2, max_pages=50, driver_path=None, page_timeout=20, checkout_timeout=60):
+        if webdriver is None:
+            raise ImportError("selenium is required for the browser pool")
+        self.size = size
+        self.max_pages = max_pages
+        self.driver_path = driver_path  # None lets Selenium Manager locate (or fetch) chromedriver
+        self.page_timeout = page_timeout
+        self.checkout_timeout = checkout_timeout
+        self._idle = deque()
+        self._created = 0
+        self._pages = {}
+        # Guards _idle/_created/_pages; waiters are woken whenever a driver or a slot frees up
+        self._lock = threading.Condition()
+        self._closed = False
+
+    def _new_driver(self):
+        service = Service(self.driver_path) if self.driver_path else Service()
+        driver = webdriver.Chrome(service=service, options=build_chrome_options())
+        driver.set_page_load_timeout(self.page_timeout)
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except WebDriverException as e:
+            logging.warning(f"Could not enable resource blocking: {e}")
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _release(self, driver):
+        with self._lock:
+            self._idle.append(driver)
+            self._lock.notify()
+
+    def _discard(self, driver):
+        """Quit a driver and free its slot, so a waiting caller can start a replacement"""
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._created -= 1
+            self._lock.notify()
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def warm(self):
+        """Start all drivers up front so the first scrapes don't pay the start-up cost"""
+        drivers = [self._checkout() for _ in range(self.size)]
+        for driver in drivers:
+            self._release(driver)
+
+    def _checkout(self, timeout=None):
+        """Take an idle driver, start one if below size, or wait for either (TimeoutError after timeout)"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    return self._idle.popleft()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser driver became free within {timeout}s")
+                self._lock.wait(remaining)
+        try:
+            return self._new_driver()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+                self._lock.notify()
+            raise
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver; it is recycled after max_pages uses or if the page crashes it"""
+        driver = self._checkout()
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            with self._lock:
+                self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+                recycle = not healthy or self._closed or self._pages[id(driver)] >= self.max_pages
+            if recycle:
+                logging.info("Recycling browser driver" + ("" if healthy else " after crash"))
+                self._discard(driver)
+            else:
+                self._release(driver)
+
+    def get_page_source(self, url, wait_timeout=10):
+        """Load a product page in a pooled driver and return its HTML once the key elements are present
+
+        Raises BrowserPageBlocked for a CAPTCHA or a page where the product never appeared.
+        """
+        with self.driver() as driver:
+            driver.get(url)
+            if not wait_for_product(driver, timeout=wait_timeout):
+                raise BrowserPageBlocked(f"Product never loaded: {url}")
+            if driver.find_elements(By.CSS_SELECTOR, CAPTCHA_SELECTOR):
+                raise BrowserPageBlocked(f"CAPTCHA page: {url}")
+            return driver.page_source
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            drivers = list(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+        for driver in drivers:
+            self._discard(driver)
@@ -0,0 +1,76 @@
+import logging
+import threading
+
+
+class CoalescedScrapeTimeout(TimeoutError):
+    """Raised to a waiter when the in-flight scrape it joined doesn't finish in time"""
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution whose result all callers share
+
+    The first caller for a key runs the function; callers arriving while it is in flight wait
+    (up to `timeout` seconds) and receive the same result or exception.
+    """
+
+    def __init__(self, timeout=120):
+        self.timeout = timeout
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "coalesced": 0, "timeouts": 0, "errors": 0}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats["executed"] += 1
+            else:
+                flight.waiters += 1
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            logging.info(f"Joining in-flight scrape for {key}")
+            if not flight.done.wait(self.timeout):
+                with self._lock:
+                    self.stats["timeouts"] += 1
+                raise CoalescedScrapeTimeout(f"Timed out after {self.timeout}s waiting for in-flight scrape of {key}")
+            if flight.error is not None:
+                raise flight.error
+            return _copy(flight.result)
+
+        try:
+            flight.result = func(*args, **kwargs)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            # Later callers start a fresh scrape; waiters already hold the flight
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        if flight.waiters:
+            logging.info(f"Shared scrape for {key} with {flight.waiters} waiting request(s)")
+        return _copy(flight.result)
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._flights)}
+
+
+def _copy(result):
+    # Each caller gets its own dict so later updates (listing data, offers) don't leak between them
+    return dict(result) if isinstance(result, dict) else result
@@ -0,0 +1,130 @@
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+
+# Month names per language; English is always included since Amazon mixes it into other locales
+MONTHS = {
+    "en": ["january", "february", "march", "april", "may", "june", "july", "august",
+           "september", "october", "november", "december"],
+    "de": ["januar", "februar", "märz", "april", "mai", "juni", "juli", "august",
+           "september", "oktober", "november", "dezember"],
+    "fr": ["janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août",
+           "septembre", "octobre", "novembre", "décembre"],
+    "es": ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+           "septiembre", "octubre", "noviembre", "diciembre"],
+    "it": ["gennaio", "febbraio", "marzo", "aprile", "maggio", "giugno", "luglio", "agosto",
+           "settembre", "ottobre", "novembre", "dicembre"],
+}
+
+RELATIVE_DAYS = {
+    "en": {"today": 0, "tomorrow": 1},
+    "de": {"heute": 0, "morgen": 1, "übermorgen": 2},
+    "fr": {"aujourd'hui": 0, "demain": 1},
+    "es": {"hoy": 0, "mañana": 1},
+    "it": {"oggi": 0, "domani": 1},
+}
+
+MARKETPLACE_LANGUAGES = {"de": "de", "fr": "fr", "es": "es", "com.mx": "es", "it": "it"}
+
+# Text between two dates that makes them a range ("Mar 4 - Wednesday, Mar 6", "4 to 6 March")
+RANGE_CONNECTOR_RE = re.compile(r"[-–]|\b(?:to|and|bis|au|al|y|e)\b", re.IGNORECASE)
+MAX_CONNECTOR_LENGTH = 20
+
+# Dates more than this many days before the scrape are taken to be next year (e.g. "Jan 2" scraped on Dec 30)
+YEAR_ROLLOVER_DAYS = 30
+
+
+@lru_cache(maxsize=None)
+def _matcher(language):
+    """One compiled pattern covering every supported date form for a language"""
+    names = {}
+    for lang in {"en", language}:
+        for number, name in enumerate(MONTHS.get(lang, []), 1):
+            names[name] = number
+            names[name[:3]] = number
+            if name.startswith("sept"):
+                names["sept"] = number
+    relative = dict(RELATIVE_DAYS["en"])
+    relative.update(RELATIVE_DAYS.get(language, {}))
+
+    month = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    rel = "|".join(re.escape(r) for r in sorted(relative, key=len, reverse=True))
+    pattern = re.compile(
+        rf"(?P<rd1>\d{{1,2}})\.?\s*(?:[-–]|to|bis|au|al)\s*(?P<rd2>\d{{1,2}})\.?\s+(?:de\s+)?(?P<rmonth>{month})\b\.?"  # 4-6 March
+        rf"|\b(?P<fmonth>{month})\b\.?\s+(?P<fd1>\d{{1,2}})\s*(?:[-–]|to)\s*"                         # Mar 4 - 6,
+        rf"(?:(?P<fmonth2>{month})\b\.?\s+)?(?P<fd2>\d{{1,2}})(?!\d)"                                # Mar 30 - Apr 2
+        rf"|(?P<day>\d{{1,2}})\.?\s+(?:de\s+)?(?P<month>{month})\b\.?"                             # 4 March, 4. März
+        rf"|\b(?P<month2>{month})\b\.?\s+(?P<day2>\d{{1,2}})(?!\d)"                                 # Mar 4
+        rf"|\b(?P<relative>{rel})\b",                                                               # tomorrow
+        re.IGNORECASE
+    )
+    return pattern, names, relative
+
+
+def _resolve(day, month, scraped_on):
+    try:
+        candidate = date(scraped_on.year, month, day)
+    except ValueError:
+        return None
+    if candidate < scraped_on - timedelta(days=YEAR_ROLLOVER_DAYS):
+        try:
+            candidate = date(scraped_on.year + 1, month, day)
+        except ValueError:
+            return None
+    return candidate
+
+
+@lru_cache(maxsize=4096)
+def _parse(text, scraped_on, language):
+    pattern, names, relative = _matcher(language)
+    dates = []
+    previous_end = None
+    for match in pattern.finditer(text):
+        # A second date only extends the range when joined by a connector, not e.g. "Or fastest delivery ..."
+        if dates and previous_end is not None:
+            gap = text[previous_end:match.start()]
+            if len(gap) > MAX_CONNECTOR_LENGTH or not RANGE_CONNECTOR_RE.search(gap):
+                break
+        previous_end = match.end()
+
+        if match.group("rd1"):
+            month = names[match.group("rmonth").lower()]
+            dates.extend(filter(None, (
+                _resolve(int(match.group("rd1")), month, scraped_on),
+                _resolve(int(match.group("rd2")), month, scraped_on)
+            )))
+        elif match.group("fd1"):
+            month = names[match.group("fmonth").lower()]
+            end_month = names[match.group("fmonth2").lower()] if match.group("fmonth2") else month
+            dates.extend(filter(None, (
+                _resolve(int(match.group("fd1")), month, scraped_on),
+                _resolve(int(match.group("fd2")), end_month, scraped_on)
+            )))
+        elif match.group("day"):
+            dates.append(_resolve(int(match.group("day")), names[match.group("month").lower()], scraped_on))
+        elif match.group("month2"):
+            dates.append(_resolve(int(match.group("day2")), names[match.group("month2").lower()], scraped_on))
+        else:
+            dates.append(scraped_on + timedelta(days=relative[match.group("relative").lower()]))
+        dates = [d for d in dates if d]
+        if len(dates) >= 2:
+            break
+
+    if not dates:
+        return None
+    start, end = dates[0], dates[-1]
+    if end < start:
+        start, end = end, start
+    return start, end
+
+
+def parse_delivery(text, scraped_on=None, marketplace="in"):
+    """Parse Amazon delivery text into a (start, end) date range (start == end for a single day)
+
+    Returns None if no date could be found. Results are memoized on (text, scrape date, locale),
+    since the same few dozen delivery strings repeat across a bulk run.
+    """
+    if not text or text == "N/A":
+        return None
+    scraped_on = scraped_on or date.today()
+    return _parse(text, scraped_on, MARKETPLACE_LANGUAGES.get(marketplace, "en"))
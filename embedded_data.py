@@ -0,0 +1,124 @@
+import html
+import json
+import re
+
+# Targeted patterns for data Amazon ships inline - scanned directly over the raw HTML,
+# without building a DOM tree
+TITLE_RE = re.compile(r'<span id="productTitle"[^>]*>([^<]+)</span>')
+BUYBOX_PRICE_RE = re.compile(r'class="a-section aok-hidden twister-plus-buying-options-price-data">(\{.*?\})</div>', re.S)
+MRP_RE = re.compile(r'aok-offscreen">\s*(?:M\.R\.P\.|List Price):\s*([^<]+?)\s*</span>')
+PARENT_ASIN_RE = re.compile(r'"parentAsin"\s*:\s*"([A-Z0-9]{10})"')
+CURRENT_ASIN_RE = re.compile(r'"currentAsin"\s*:\s*"([A-Z0-9]{10})"')
+
+_decoder = json.JSONDecoder()
+
+
+def _json_after(page_html, marker, start=0):
+    """Decode the JSON value that follows a marker like '"dimensions" :' (None if absent or invalid)"""
+    index = page_html.find(marker, start)
+    if index < 0:
+        return None
+    index += len(marker)
+    # Skip whitespace and the key/value separator
+    while index < len(page_html) and page_html[index] in ' \t\r\n:':
+        index += 1
+    try:
+        value, _ = _decoder.raw_decode(page_html, index)
+    except ValueError:
+        return None
+    return value
+
+
+def _numeric(price_text):
+    try:
+        return float(re.sub(r'[^\d.]', '', price_text))
+    except ValueError:
+        return 0
+
+
+def extract_title(page_html):
+    match = TITLE_RE.search(page_html)
+    if match:
+        title = html.unescape(match.group(1)).strip()
+        return title or None
+    return None
+
+
+def extract_prices(page_html):
+    """Buy-box price from the twister price-data blob and MRP from the strike-price offscreen text"""
+    prices = {}
+    match = BUYBOX_PRICE_RE.search(page_html)
+    if match:
+        try:
+            groups = json.loads(match.group(1))
+        except ValueError:
+            groups = {}
+        for offers in groups.values():
+            if offers and offers[0].get("displayPrice"):
+                prices["Current Price"] = offers[0]["displayPrice"]
+                prices["current_price_value"] = float(offers[0].get("priceAmount") or _numeric(offers[0]["displayPrice"]))
+                prices["currency_symbol"] = offers[0].get("currencySymbol")
+                break
+
+    match = MRP_RE.search(page_html)
+    if match:
+        prices["Original Price (MRP)"] = match.group(1)
+        prices["original_price_value"] = _numeric(match.group(1))
+    return prices
+
+
+def extract_images(page_html):
+    """Image URLs from the image block's colorImages JSON (hi-res first, falling back to large)"""
+    index = page_html.find("'colorImages'")
+    if index < 0:
+        return []
+    images = _json_after(page_html, "'initial':", index)
+    if not isinstance(images, list):
+        return []
+    urls = []
+    for image in images:
+        url = image.get("hiRes") or image.get("large")
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def extract_variations(page_html):
+    """Parent ASIN and the variation family from the twister data"""
+    variations = {}
+    match = PARENT_ASIN_RE.search(page_html)
+    if match:
+        variations["parent_asin"] = match.group(1)
+    match = CURRENT_ASIN_RE.search(page_html)
+    if match:
+        variations["current_asin"] = match.group(1)
+
+    dimensions = _json_after(page_html, '"dimensions" :')
+    display_data = _json_after(page_html, '"dimensionValuesDisplayData" :')
+    if isinstance(display_data, dict):
+        children = {}
+        for asin, values in display_data.items():
+            if isinstance(dimensions, list) and len(dimensions) == len(values):
+                children[asin] = dict(zip(dimensions, values))
+            else:
+                children[asin] = {str(i): value for i, value in enumerate(values)}
+        variations["children"] = children
+    if isinstance(dimensions, list):
+        variations["dimensions"] = dimensions
+    return variations
+
+
+def extract_embedded_data(page_html):
+    """Fast-path scan of inline script/state payloads; returns only the fields it found"""
+    data = {}
+    title = extract_title(page_html)
+    if title:
+        data["Title"] = title
+    data.update(extract_prices(page_html))
+    images = extract_images(page_html)
+    if images:
+        data["images"] = images
+    variations = extract_variations(page_html)
+    if variations:
+        data["variations"] = variations
+    return data
@@ -0,0 +1,70 @@
+# Output fields produced by each extractor group; field-selective scrapes only run the groups asked for.
+# A trailing * is a prefix (dynamic columns such as "Bullet Point 3" or "Tech_Item_Weight").
+EXTRACTOR_GROUPS = {
+    "title": ("Title",),
+    "prices": ("Current Price", "Original Price (MRP)", "Discount Percentage"),
+    "availability": ("Availability",),
+    "images": ("Main Image", "Image URLs"),
+    "variations": ("Parent ASIN", "Variation ASINs", "Variation Attributes"),
+    "bullets": ("Bullet Points", "Bullet Point*"),
+    "delivery": ("Delivery Date Raw", "Delivery Date Parsed", "Delivery Start", "Delivery End"),
+    "description": ("Description",),
+    "technical_details": ("Tech_*",),
+}
+
+# Named field sets, e.g. fields=["price"] for price monitoring runs
+FIELD_PRESETS = {
+    "price": ("prices", "availability", "delivery"),
+    "all": tuple(EXTRACTOR_GROUPS),
+}
+
+# Groups whose selectors all sit in the centre column / buy box. When only these are requested
+# the page is parsed restricted to those containers instead of building the full DOM.
+BUYBOX_GROUPS = frozenset(("title", "prices", "availability", "delivery"))
+BUYBOX_CONTAINERS = ("centerCol", "rightCol")
+
+
+def _matches(field, output):
+    if output.endswith("*"):
+        return field.startswith(output[:-1])
+    if field.endswith("*"):
+        return output.startswith(field[:-1])
+    return field == output
+
+
+def resolve_groups(fields):
+    """Extractor groups needed for the requested fields, presets or group names (None = all groups)"""
+    if not fields:
+        return None
+    groups = set()
+    for field in fields:
+        if field in FIELD_PRESETS:
+            groups.update(FIELD_PRESETS[field])
+        elif field in EXTRACTOR_GROUPS:
+            groups.add(field)
+        else:
+            groups.update(group for group, outputs in EXTRACTOR_GROUPS.items()
+                          if any(_matches(field, output) for output in outputs))
+    return frozenset(groups)
+
+
+def expand_fields(fields):
+    """Replace preset and group names with the output fields they stand for"""
+    if not fields:
+        return fields
+    expanded = []
+    for field in fields:
+        if field in FIELD_PRESETS or field in EXTRACTOR_GROUPS:
+            groups = FIELD_PRESETS.get(field, (field,))
+            expanded.extend(output for group in groups for output in EXTRACTOR_GROUPS[group])
+        else:
+            expanded.append(field)
+    return list(dict.fromkeys(expanded))
+
+
+def field_group(field):
+    """Extractor group that produces a field, or None for always-present fields (ASIN, URL, ...)"""
+    for group, outputs in EXTRACTOR_GROUPS.items():
+        if any(_matches(field, output) for output in outputs):
+            return group
+    return None
@@ -0,0 +1,24 @@
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("THREADS", 4))
+
+# Import the app once in the master and fork workers from it, so modules loaded at
+# start-up are shared copy-on-write instead of being re-imported by every worker
+preload_app = True
+
+# Scrapes can take a while (retries, browser fallback)
+timeout = 300
+
+# Threads started in the preloaded master don't exist in the forked workers, so the app
+# defers its background services and each worker starts its own once it is up.
+# All workers append to one log file, so none of them rotates it; rotate it externally, e.g.
+#   /path/to/amazon_scraper_app.log { daily  rotate 7  compress  missingok }  (logrotate)
+raw_env = ["DEFER_BACKGROUND_SERVICES=1", "LOG_ROTATE=0"]
+
+
+def post_worker_init(worker):
+    from app import start_background_services
+    start_background_services(worker.wsgi.config)
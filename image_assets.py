@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+# Amazon CDN URLs carry a size/processing token before the extension, e.g.
+# .../I/71xyz._AC_SX679_.jpg or .../I/71xyz._SL1500_.jpg; without it the original is served
+SIZE_TOKEN_RE = re.compile(r"\._[A-Za-z0-9_,.-]+?_(\.(?:jpe?g|png|gif|webp))$", re.IGNORECASE)
+EXTENSION_RE = re.compile(r"\.(jpe?g|png|gif|webp)$", re.IGNORECASE)
+# Amazon's image CDN hosts; nothing else is ever fetched (the API takes client-supplied URLs)
+IMAGE_HOSTS = frozenset((
+    "m.media-amazon.com",
+    "images-na.ssl-images-amazon.com",
+    "images-eu.ssl-images-amazon.com",
+    "images-fe.ssl-images-amazon.com",
+))
+
+
+def is_image_cdn_url(url):
+    """True for https URLs on Amazon's image CDN"""
+    try:
+        parts = urlsplit(url)
+        return parts.scheme == "https" and parts.hostname in IMAGE_HOSTS and parts.port in (None, 443)
+    except ValueError:  # Malformed host or port
+        return False
+
+
+def base_image_url(url):
+    """Image URL with any size token removed (the full-resolution original)"""
+    return SIZE_TOKEN_RE.sub(r"\1", url)
+
+
+def sized_image_url(url, size):
+    """Variant of an Amazon image URL whose longest side is `size` pixels (None keeps the original)"""
+    base = base_image_url(url)
+    if not size:
+        return base
+    match = EXTENSION_RE.search(base)
+    if not match:
+        return base
+    return f"{base[:match.start()]}._SL{int(size)}_{match.group(0)}"
+
+
+class ImageDownloader:
+    """Downloads product images concurrently into a content-addressed directory
+
+    URLs are deduplicated (after size normalisation) against an index persisted next to the
+    files, and identical bytes from different URLs are stored once under their SHA-256.
+    Concurrency is capped per CDN host and overall.
+    """
+
+    def __init__(self, root="images", size=1000, per_host=4, max_concurrency=16, timeout=30):
+        self.root = root
+        self.size = size
+        self.per_host = per_host
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.index_file = os.path.join(root, "index.json")
+        self._index = {}  # sized URL -> path relative to root
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not load image index {self.index_file}: {str(e)}")
+        self.stats = {"downloaded": 0, "url_duplicates": 0, "content_duplicates": 0, "failed": 0}
+
+    def _store(self, content, url):
+        """Write bytes under images/<aa>/<sha256>.<ext> unless identical content is already there"""
+        digest = hashlib.sha256(content).hexdigest()
+        match = EXTENSION_RE.search(urlsplit(url).path)
+        extension = match.group(0).lower() if match else ".jpg"
+        relative = os.path.join(digest[:2], digest + extension)
+        path = os.path.join(self.root, relative)
+        if os.path.exists(path):
+            self._count("content_duplicates")
+            return relative
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+        self._count("downloaded")
+        return relative
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _fetch(self, url):
+        if not is_image_cdn_url(url):
+            raise ValueError(f"Not an Amazon image CDN URL: {url}")
+        # No redirects - they could lead off the CDN
+        response = requests.get(url, timeout=self.timeout, allow_redirects=False)
+        response.raise_for_status()
+        if response.status_code != 200:
+            raise ValueError(f"Unexpected status {response.status_code} for {url}")
+        return response.content
+
+    async def _download_one(self, url, host_limits, overall):
+        host = urlsplit(url).netloc
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(self.per_host)
+        # Per-host slot first, so a busy host doesn't hold overall slots other hosts could use
+        async with host_limits[host], overall:
+            try:
+                # requests is blocking; run it off the event loop
+                content = await asyncio.to_thread(self._fetch, url)
+                relative = await asyncio.to_thread(self._store, content, url)
+            except Exception as e:
+                logging.warning(f"Image download failed for {url}: {str(e)}")
+                self._count("failed")
+                return url, None
+        with self._lock:
+            self._index[url] = relative
+        return url, relative
+
+    async def download(self, urls):
+        """Download images; returns {original URL: path relative to root, or None if it failed}"""
+        sized = {url: sized_image_url(url, self.size) for url in urls if url}
+        pending = []
+        for target in dict.fromkeys(sized.values()):
+            if target in self._index and os.path.exists(os.path.join(self.root, self._index[target])):
+                self._count("url_duplicates")
+            else:
+                pending.append(target)
+
+        host_limits = {}
+        overall = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(self._download_one(url, host_limits, overall) for url in pending))
+        if pending:
+            self._save_index()
+
+        fetched = dict(results)
+        return {url: fetched[target] if target in fetched else self._index.get(target) for url, target in sized.items()}
+
+    def download_all(self, urls):
+        """Blocking wrapper around download() for synchronous callers"""
+        return asyncio.run(self.download(list(urls)))
+
+    def _save_index(self):
+        with self._lock:
+            index = dict(self._index)
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = f"{self.index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_path, self.index_file)
@@ -0,0 +1,117 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlparse, urlunparse
+
+from bs4 import BeautifulSoup
+
+ASIN_RE = re.compile(r'^[A-Z0-9]{10}$')
+RATING_RE = re.compile(r'(\d+(?:[.,]\d+)?) out of 5')
+
+# Result containers for search pages and for bestseller/category grids
+RESULT_SELECTORS = [
+    'div[data-component-type="s-search-result"][data-asin]',
+    '#gridItemRoot [data-asin]',
+    '.zg-grid-general-faceout [data-asin]',
+    '.p13n-sc-uncoverable-faceout[id]',
+    '.s-result-item[data-asin]'
+]
+
+
+class ListingCrawler:
+    """Pages through search or category/bestseller listings and extracts ASINs with listing-level data"""
+
+    def __init__(self, scraper, workers=3, page_retries=1):
+        self.scraper = scraper
+        self.workers = workers
+        self.page_retries = page_retries  # Extra attempts for a page whose fetch failed
+
+    def search_url(self, query, page):
+        return f"{self.scraper.base_url}/s?k={quote_plus(query)}&page={page}"
+
+    def listing_url(self, url, page):
+        """Set the page parameter on a category or bestseller URL (bestsellers use pg=, search uses page=)"""
+        parts = urlparse(url)
+        params = dict(parse_qsl(parts.query))
+        params["pg" if "/zgbs/" in parts.path or "bestsellers" in parts.path else "page"] = str(page)
+        return urlunparse(parts._replace(query=urlencode(params)))
+
+    def _fetch_page(self, url):
+        """Listing items on a page, [] for a page without results, or None if it couldn't be fetched"""
+        for attempt in range(1 + self.page_retries):
+            try:
+                response = self.scraper._make_request(url)
+            except Exception as e:
+                logging.error(f"Error fetching listing page {url}: {str(e)}")
+                response = None
+            if response:
+                return self.parse_listing(response.text)
+            logging.warning(f"Failed to retrieve listing page (attempt {attempt + 1}): {url}")
+        return None
+
+    def parse_listing(self, page_html):
+        """Extract ASIN, title, price, rating and review count for every result on a listing page"""
+        soup = BeautifulSoup(page_html, "html.parser")
+
+        items = {}
+        for selector in RESULT_SELECTORS:
+            for element in soup.select(selector):
+                asin = element.get("data-asin") or element.get("id")
+                if not asin or not ASIN_RE.match(asin) or asin in items:
+                    continue
+                items[asin] = self._parse_item(asin, element)
+            if items:
+                break
+        return list(items.values())
+
+    def _parse_item(self, asin, element):
+        item = {"ASIN": asin}
+
+        title = element.select_one("h2 span, h2 a span, ._cDEzb_p13n-sc-css-line-clamp-3_g3dy1, .p13n-sc-truncate-desktop-type2")
+        item["Listing Title"] = title.get_text(strip=True) if title else "N/A"
+
+        price = element.select_one(".a-price:not(.a-text-price) .a-offscreen, .p13n-sc-price, ._cDEzb_p13n-sc-price_3mJ9Z")
+        item["Listing Price"] = price.get_text(strip=True) if price else "N/A"
+
+        rating = element.select_one(".a-icon-alt")
+        match = RATING_RE.search(rating.get_text()) if rating else None
+        item["Listing Rating"] = match.group(1) if match else "N/A"
+
+        reviews = element.select_one('[aria-label$="ratings"], span.a-size-base.s-underline-text, .a-icon-row .a-size-small')
+        item["Listing Review Count"] = (re.sub(r'[^\d]', '', reviews.get_text()) or "N/A") if reviews else "N/A"
+        return item
+
+    def crawl(self, query=None, url=None, max_pages=5):
+        """Yield listing items page window by page window, fetching each window concurrently
+
+        Stops early once a window returns an empty page (past the last page of results). Pages
+        that can't be fetched are retried, then skipped without ending the crawl.
+        """
+        if not query and not url:
+            raise ValueError("A search query or listing URL is required")
+
+        page = 1
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while page <= max_pages:
+                window = range(page, min(page + self.workers, max_pages + 1))
+                futures = {
+                    executor.submit(self._fetch_page, self.search_url(query, n) if query else self.listing_url(url, n)): n
+                    for n in window
+                }
+                exhausted = False
+                for future in as_completed(futures):
+                    try:
+                        items = future.result()
+                    except Exception as e:
+                        logging.error(f"Error crawling listing page {futures[future]}: {str(e)}")
+                        items = None
+                    if items is None:
+                        logging.warning(f"Skipping listing page {futures[future]} after failed fetches")
+                        continue
+                    if not items:
+                        exhausted = True
+                    logging.info(f"Listing page {futures[future]} yielded {len(items)} products")
+                    yield from items
+                if exhausted:
+                    break
+                page += len(window)
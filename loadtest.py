@@ -0,0 +1,184 @@
+import argparse
+import io
+import json
+import logging
+import os
+import resource
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_amazon import MockAmazonServer, add_settings_arguments, settings_from_args
+
+# Rendered by templates/index.html only when a route reports an error
+ERROR_ELEMENT = b'class="status-message error-message"'
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def synthetic_asins(count, unique=True):
+    """ASIN-shaped ids; with unique=False they repeat so request coalescing can be exercised"""
+    pool = count if unique else max(1, count // 10)
+    return [f"B0LOAD{i % pool:04d}" for i in range(count)]
+
+
+def bulk_workbook(asins):
+    """In-memory .xlsx with an ASINS column, as the bulk upload form expects"""
+    import pandas as pd
+    buffer = io.BytesIO()
+    pd.DataFrame({"ASINS": asins}).to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+class LoadTest:
+    """Drives single, bulk or API traffic through the Flask app and records per-request latency"""
+
+    def __init__(self, app, scenario, concurrency=4, bulk_size=10):
+        self.app = app
+        self.scenario = scenario
+        self.concurrency = concurrency
+        self.bulk_size = bulk_size
+        self.latencies = []
+        self.outcomes = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client
+
+    def _send(self, asin):
+        client = self._client()
+        if self.scenario == "api":
+            response = client.post("/api/scrape", json={"asin": asin})
+            return response.status_code == 200, response.status_code
+        if self.scenario == "single":
+            response = client.post("/scrape_single_product", data={"asin": asin})
+        else:
+            asins = [f"{asin[:-2]}{i:02d}" for i in range(self.bulk_size)]
+            response = client.post("/scrape_bulk_products", data={
+                "excelFile": (bulk_workbook(asins), "asins.xlsx")
+            }, content_type="multipart/form-data")
+        # HTML routes report failures in the page rather than the status code; match the rendered
+        # error element, not the ".error-message" CSS rule every page contains
+        ok = response.status_code == 200 and ERROR_ELEMENT not in response.data
+        return ok, response.status_code if ok or response.status_code != 200 else "page error"
+
+    def _timed(self, asin):
+        start = time.perf_counter()
+        try:
+            ok, outcome = self._send(asin)
+        except Exception as e:
+            ok, outcome = False, type(e).__name__
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies.append(elapsed)
+            key = "ok" if ok else str(outcome)
+            self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+    def run(self, asins):
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        peak_threads = threading.active_count()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self._timed, asin) for asin in asins]
+            for future in futures:
+                future.result()
+                peak_threads = max(peak_threads, threading.active_count())
+        wall = time.perf_counter() - start
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+        latencies = sorted(self.latencies)
+        products = len(asins) * (self.bulk_size if self.scenario == "bulk" else 1)
+        return {
+            "scenario": self.scenario,
+            "requests": len(asins),
+            "concurrency": self.concurrency,
+            "outcomes": self.outcomes,
+            "wall_seconds": round(wall, 3),
+            "requests_per_second": round(len(asins) / wall, 3) if wall else None,
+            "products_per_second": round(products / wall, 3) if wall else None,
+            "latency_seconds": {
+                "p50": percentile(latencies, 0.50),
+                "p90": percentile(latencies, 0.90),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else None
+            },
+            "cpu_user_seconds": round(usage_after.ru_utime - usage_before.ru_utime, 3),
+            "cpu_system_seconds": round(usage_after.ru_stime - usage_before.ru_stime, 3),
+            "max_rss_mb": round(usage_after.ru_maxrss / 1024, 1),  # ru_maxrss is KiB on Linux
+            "peak_threads": peak_threads
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end load test against a local mock Amazon")
+    parser.add_argument("--scenario", choices=("api", "single", "bulk"), default="api")
+    parser.add_argument("--requests", type=int, default=50, help="Requests to send (bulk: uploads)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--bulk-size", type=int, default=10, help="ASINs per bulk upload")
+    parser.add_argument("--repeat-asins", action="store_true", help="Reuse ASINs to exercise request coalescing")
+    parser.add_argument("--request-delay", type=float, default=0.0, help="Scraper's per-request pause (production: 2)")
+    parser.add_argument("--mock-url", default=None, help="Use an already running mock_amazon.py instead of starting one")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    mock = None
+    base_url = args.mock_url
+    if not base_url:
+        mock = MockAmazonServer(settings=settings_from_args(args)).start()
+        base_url = mock.url
+
+    from app import create_app
+
+    work_dir = tempfile.mkdtemp(prefix="amz-loadtest-")
+    app = create_app({
+        "TESTING": True,
+        "AMAZON_BASE_URL": base_url,
+        "REQUEST_DELAY": args.request_delay,
+        "BULK_REQUEST_DELAY": (0, 0),
+        "LOG_FILE": os.path.join(work_dir, "loadtest.log"),
+        "TECH_SCHEMA_FILE": os.path.join(work_dir, "tech_schema.json"),
+        "WATCHLIST_DB": os.path.join(work_dir, "watchlist.db"),
+        "RESULTS_DB": os.path.join(work_dir, "results.db"),
+        # Scraped mock pages must not land in the fixture corpus the mock server replays
+        "DEBUG_HTML_DIR": os.path.join(work_dir, "debug_html"),
+        "WEBHOOK_OUTBOX": os.path.join(work_dir, "webhook_outbox.db"),
+        "PROFILES_DIR": os.path.join(work_dir, "profiles"),
+        "IMAGES_DIR": os.path.join(work_dir, "images"),
+        "REVIEWS_DIR": os.path.join(work_dir, "reviews"),
+        "BROKER_URL": f"sqlite:///{os.path.join(work_dir, 'broker.db')}"
+    })
+    # Per-request INFO lines would dominate the run; keep warnings and errors only
+    logging.getLogger().setLevel(logging.WARNING)
+
+    test = LoadTest(app, args.scenario, concurrency=args.concurrency, bulk_size=args.bulk_size)
+    report = test.run(synthetic_asins(args.requests, unique=not args.repeat_asins))
+    report["mock_server"] = dict(mock.stats) if mock else base_url
+
+    from app import amazon_scraper, scrape_flights
+    report["fetch_stats"] = amazon_scraper.get_fetch_stats()
+    report["coalescing"] = scrape_flights.snapshot()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:>22}: {value}")
+
+    if mock:
+        mock.stop()
+
+
+if __name__ == '__main__':
+    main()
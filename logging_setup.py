@@ -0,0 +1,144 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+
+# Structured fields attached to every record logged inside a log_context() block
+CONTEXT_FIELDS = ("job_id", "asin", "marketplace", "stage", "duration_ms")
+_log_context = contextvars.ContextVar("log_context", default={})
+
+_listener = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach job/ASIN/marketplace/stage fields to all records logged in this block (and this thread)"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current log context onto the record before it leaves the calling thread"""
+
+    def filter(self, record):
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Sample DEBUG records and cap them per second so debug logging stays cheap at high throughput"""
+
+    def __init__(self, sample_rate=0.1, max_per_second=50):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self._window = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        if random.random() >= self.sample_rate:
+            return False
+        now = int(time.monotonic())
+        with self._lock:
+            if now != self._window:
+                self._window, self._count = now, 0
+            self._count += 1
+            return self._count <= self.max_per_second
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the structured context fields"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "logger": record.name,
+            "thread": record.threadName
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(log_file, level=logging.INFO, max_bytes=10 * 1024 * 1024, backup_count=5,
+                      debug_sample_rate=0.1, debug_max_per_second=50, rotate=True):
+    """Route all logging through a queue so file/console I/O happens on a background thread
+
+    The log file gets JSON lines; the console keeps the plain text format. With rotate=False the
+    file is left to external rotation (logrotate) and reopened when it is moved away.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    if rotate:
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    else:
+        file_handler = WatchedFileHandler(log_file, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    log_queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(debug_sample_rate, debug_max_per_second))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_stop_listener)
+
+    # The listener thread doesn't survive fork (e.g. gunicorn --preload); restart it in each child
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=lambda: _restart_listener(queue_handler))
+    return _listener
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_listener(queue_handler):
+    global _listener
+    log_queue = queue.Queue(-1)
+    queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *[_forked_handler(h) for h in _listener.handlers], respect_handler_level=True)
+    _listener.start()
+
+
+def _forked_handler(handler):
+    """Child processes append to the shared file but never rotate it - several workers rotating one
+    file on their own schedules truncate each other's lines. They reopen it once it has been rotated."""
+    if not isinstance(handler, RotatingFileHandler):
+        return handler
+    watched = WatchedFileHandler(handler.baseFilename, encoding=handler.encoding)
+    watched.setFormatter(handler.formatter)
+    watched.setLevel(handler.level)
+    handler.close()  # Only closes this process's copy of the descriptor
+    return watched
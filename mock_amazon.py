@@ -0,0 +1,173 @@
+import argparse
+import itertools
+import logging
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Saved product pages replayed for /dp/<asin>, and the saved CAPTCHA interstitial. A fixed list rather
+# than a glob: debug_html/ also collects pages saved by live scrapes, which must not become fixtures.
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PAGES = tuple(os.path.join(FIXTURES_DIR, "debug_html", f"amazon_B0CGW18S6Y_{stamp}.html") for stamp in (
+    "20250307_172914", "20250307_173457", "20250307_174420", "20250307_175258",
+    "20250307_175529", "20250307_180023", "20250307_180027", "20250307_185830",
+))
+CAPTCHA_PAGE = os.path.join(FIXTURES_DIR, "amazon_B0CGW18S6Y_debug.html")
+CORPUS_ASIN = "B0CGW18S6Y"
+
+DP_PATH_RE = re.compile(r"^/dp/([A-Z0-9]{10})")
+
+
+class MockSettings:
+    """Fault and network shaping knobs for the mock server (rates are probabilities per request)"""
+
+    def __init__(self, latency=0.2, latency_jitter=0.1, bandwidth=None, error_rate=0.0,
+                 throttle_rate=0.0, captcha_rate=0.0, seed=None):
+        self.latency = latency  # Seconds before the first byte
+        self.latency_jitter = latency_jitter
+        self.bandwidth = bandwidth  # Bytes per second, None for unlimited
+        self.error_rate = error_rate  # HTTP 500
+        self.throttle_rate = throttle_rate  # HTTP 503
+        self.captcha_rate = captcha_rate  # 200 with the CAPTCHA page
+        self.random = random.Random(seed)
+
+
+class MockAmazonServer:
+    """Local stand-in for amazon.<tld> that replays the debug_html corpus with configurable faults"""
+
+    def __init__(self, host="127.0.0.1", port=0, settings=None, corpus=CORPUS_PAGES, captcha_page=CAPTCHA_PAGE):
+        self.settings = settings or MockSettings()
+        if not corpus:
+            raise ValueError("The mock server needs at least one corpus page")
+        self.pages = []
+        for path in corpus:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                self.pages.append(f.read())
+        with open(captcha_page, encoding="utf-8", errors="ignore") as f:
+            self.captcha = f.read().encode("utf-8")
+        self._next_page = itertools.cycle(range(len(self.pages)))
+        self.stats = {"ok": 0, "error": 0, "throttled": 0, "captcha": 0, "not_found": 0, "bytes": 0}
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                logging.debug(f"mock amazon: {format % args}")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, outcome, size=0):
+        with self._lock:
+            self.stats[outcome] += 1
+            self.stats["bytes"] += size
+
+    def _handle(self, handler):
+        settings = self.settings
+        with self._lock:
+            roll = settings.random.random()
+            delay = max(0.0, settings.latency + settings.random.uniform(-1, 1) * settings.latency_jitter)
+            page_index = next(self._next_page)
+        time.sleep(delay)
+
+        match = DP_PATH_RE.match(handler.path)
+        if handler.path == "/__stats":
+            status, outcome, body = 200, None, repr(self.stats).encode("utf-8")
+        elif not match:
+            status, outcome, body = 404, "not_found", b"Not found"
+        elif roll < settings.error_rate:
+            status, outcome, body = 500, "error", b"Internal error"
+        elif roll < settings.error_rate + settings.throttle_rate:
+            status, outcome, body = 503, "throttled", b"Service Unavailable"
+        elif roll < settings.error_rate + settings.throttle_rate + settings.captcha_rate:
+            status, outcome, body = 200, "captcha", self.captcha
+        else:
+            # Serve the saved page as if it were the requested product
+            status, outcome = 200, "ok"
+            body = self.pages[page_index].replace(CORPUS_ASIN, match.group(1)).encode("utf-8")
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        self._write(handler, body)
+        if outcome:
+            self._count(outcome, len(body))
+
+    def _write(self, handler, body):
+        bandwidth = self.settings.bandwidth
+        if not bandwidth:
+            handler.wfile.write(body)
+            return
+        chunk_size = 16 * 1024
+        for start in range(0, len(body), chunk_size):
+            handler.wfile.write(body[start:start + chunk_size])
+            time.sleep(chunk_size / bandwidth)
+
+    def start(self):
+        """Serve on a background thread; returns self so callers can read .url"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-amazon", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_settings_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first byte")
+    parser.add_argument("--latency-jitter", type=float, default=0.1, help="Uniform +/- jitter on latency")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Bytes per second (default unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of HTTP 503 responses")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="Fraction of CAPTCHA pages")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for repeatable fault sequences")
+
+
+def settings_from_args(args):
+    return MockSettings(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        captcha_rate=args.captcha_rate,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the debug_html corpus as a local mock Amazon")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = MockAmazonServer(args.host, args.port, settings_from_args(args))
+    logging.info(f"Mock Amazon serving {len(server.pages)} corpus pages at {server.url} "
+                 f"(set AMAZON_BASE_URL={server.url} to point the scraper at it)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Marketplace (amazon.<tld>) -> (currency code, thousands separator, decimal separator)
+MARKETPLACE_FORMATS = {
+    "in": ("INR", ",", "."),
+    "com": ("USD", ",", "."),
+    "ca": ("CAD", ",", "."),
+    "com.au": ("AUD", ",", "."),
+    "co.uk": ("GBP", ",", "."),
+    "ae": ("AED", ",", "."),
+    "sg": ("SGD", ",", "."),
+    "co.jp": ("JPY", ",", "."),
+    "com.mx": ("MXN", ",", "."),
+    "de": ("EUR", ".", ","),
+    "it": ("EUR", ".", ","),
+    "es": ("EUR", ".", ","),
+    "nl": ("EUR", ".", ","),
+    "com.br": ("BRL", ".", ","),
+    "com.tr": ("TRY", ".", ","),
+    "fr": ("EUR", " ", ","),
+    "se": ("SEK", " ", ","),
+    "pl": ("PLN", " ", ","),
+}
+
+# Currency symbols that pin down the currency regardless of marketplace
+SYMBOL_CURRENCIES = {"₹": "INR", "£": "GBP", "€": "EUR", "¥": "JPY", "￥": "JPY", "R$": "BRL", "AED": "AED", "zł": "PLN", "kr": "SEK"}
+
+# Display-string columns and the typed columns derived from them
+PRICE_COLUMNS = {
+    "Current Price": "Price Value",
+    "Original Price (MRP)": "MRP Value",
+    "Listing Price": "Listing Price Value",
+}
+
+NORMALIZED_COLUMNS = ["Currency", "Price Value", "MRP Value", "Discount Value", "Listing Price Value"]
+
+
+def _parse_amounts(values, thousands, decimal):
+    """Vectorized display-string -> float conversion for one separator convention"""
+    # Non-breaking and narrow no-break spaces are used as thousands separators (fr, se, pl)
+    cleaned = values.astype("string").str.replace("[\u00a0\u202f]", " ", regex=True)
+    if thousands == " ":
+        cleaned = cleaned.str.replace(r"(?<=\d) (?=\d{3})", "", regex=True)
+    else:
+        cleaned = cleaned.str.replace(thousands, "", regex=False)
+    if decimal != ".":
+        cleaned = cleaned.str.replace(decimal, ".", regex=False)
+    return pd.to_numeric(cleaned.str.extract(r"(\d+(?:\.\d+)?)", expand=False), errors="coerce")
+
+
+def normalize_prices(df, default_marketplace="in"):
+    """Add typed price columns to a whole batch of scraped records in one vectorized pass
+
+    Adds Currency (ISO code), Price Value, MRP Value, Listing Price Value and Discount Value
+    (percent, float). The marketplace of each row is taken from its URL so separators are
+    interpreted correctly, e.g. "1.299,00 €" on amazon.de vs "₹1,299.00" on amazon.in.
+    """
+    if df.empty:
+        return df
+
+    if "URL" in df.columns:
+        marketplaces = df["URL"].astype("string").str.extract(r"amazon\.([a-z.]+?)/", expand=False)
+        marketplaces = marketplaces.fillna(default_marketplace)
+    else:
+        marketplaces = pd.Series(default_marketplace, index=df.index)
+
+    # One vectorized conversion per separator convention present in the batch
+    for column, typed_column in PRICE_COLUMNS.items():
+        if column not in df.columns:
+            continue
+        result = pd.Series(np.nan, index=df.index, dtype="float64")
+        for marketplace, rows in marketplaces.groupby(marketplaces).groups.items():
+            _, thousands, decimal = MARKETPLACE_FORMATS.get(marketplace, MARKETPLACE_FORMATS[default_marketplace])
+            amounts = _parse_amounts(df.loc[rows, column], thousands, decimal)
+            # to_numeric on a string column gives nullable Float64 (<NA> for "N/A"); plain floats with
+            # NaN are needed to assign into the float64 result without a dtype clash
+            result.loc[rows] = amounts.to_numpy(dtype="float64", na_value=np.nan)
+        df[typed_column] = result
+
+    # Currency: explicit symbol in the price text wins, otherwise the marketplace's currency
+    currency = marketplaces.map(lambda m: MARKETPLACE_FORMATS.get(m, MARKETPLACE_FORMATS[default_marketplace])[0])
+    if "Current Price" in df.columns:
+        prices = df["Current Price"].astype("string")
+        for symbol, code in SYMBOL_CURRENCIES.items():
+            currency = currency.mask(prices.str.contains(symbol, regex=False).fillna(False), code)
+    df["Currency"] = currency
+
+    if "Price Value" in df.columns and "MRP Value" in df.columns:
+        price, mrp = df["Price Value"], df["MRP Value"]
+        discount = ((mrp - price) / mrp * 100).round(1)
+        df["Discount Value"] = discount.where((mrp > price) & (price > 0))
+
+    return df
@@ -0,0 +1,84 @@
+import logging
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+OFFERS_PER_PAGE = 10
+
+
+class OfferScraper:
+    """Scrapes every offer for an ASIN from the lightweight all-offers (AOD) fragment"""
+
+    def __init__(self, scraper, workers=3, max_pages=5):
+        self.scraper = scraper
+        self.workers = workers
+        self.max_pages = max_pages
+
+    def offers_url(self, asin, page=1):
+        return f"{self.scraper.base_url}/gp/aod/ajax?asin={asin}&pc=dp&isonlyrenderofferlist={'true' if page > 1 else 'false'}&pageno={page}"
+
+    def _fetch_page(self, asin, page):
+        response = self.scraper._make_request(self.offers_url(asin, page))
+        if not response:
+            logging.warning(f"Failed to retrieve offers page {page} for ASIN: {asin}")
+            return None
+        return BeautifulSoup(response.text, "html.parser")
+
+    def get_offers(self, asin):
+        """Return structured offer records (seller, price, shipping, condition, fulfillment)"""
+        first_page = self._fetch_page(asin, 1)
+        if first_page is None:
+            return []
+
+        offers = self.parse_offers(asin, first_page)
+
+        # The first page tells us how many offers there are; fetch the rest concurrently
+        total = self._total_offers(first_page)
+        pages = min(self.max_pages, math.ceil(total / OFFERS_PER_PAGE)) if total else 1
+        if pages > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for soup in executor.map(lambda page: self._fetch_page(asin, page), range(2, pages + 1)):
+                    if soup is not None:
+                        offers.extend(self.parse_offers(asin, soup, include_pinned=False))
+
+        logging.info(f"Extracted {len(offers)} offers for ASIN {asin}")
+        return offers
+
+    def _total_offers(self, soup):
+        count = soup.select_one("#aod-total-offer-count")
+        if count and count.get("value", "").isdigit():
+            return int(count["value"])
+        text = soup.select_one("#aod-filter-offer-count-string")
+        match = re.search(r'(\d+)', text.get_text()) if text else None
+        return int(match.group(1)) if match else 0
+
+    def parse_offers(self, asin, soup, include_pinned=True):
+        selectors = "#aod-pinned-offer, #aod-offer" if include_pinned else "#aod-offer"
+        return [self._parse_offer(asin, element) for element in soup.select(selectors)]
+
+    def _parse_offer(self, asin, element):
+        def text(selector):
+            found = element.select_one(selector)
+            return found.get_text(" ", strip=True) if found else "N/A"
+
+        seller_link = element.select_one("#aod-offer-soldBy a")
+        seller_id = "N/A"
+        if seller_link and seller_link.get("href"):
+            match = re.search(r'seller=([A-Z0-9]+)', seller_link["href"])
+            seller_id = match.group(1) if match else "N/A"
+
+        ships_from = text("#aod-offer-shipsFrom .a-col-right, #aod-offer-shipsFrom .a-color-base")
+        delivery = element.select_one("[data-csa-c-delivery-price]")
+
+        return {
+            "ASIN": asin,
+            "Seller": text("#aod-offer-soldBy .a-col-right a, #aod-offer-soldBy .a-col-right .a-size-small"),
+            "Seller ID": seller_id,
+            "Price": text(".a-price .a-offscreen"),
+            "Shipping": delivery["data-csa-c-delivery-price"] if delivery else "N/A",
+            "Condition": text("#aod-offer-heading h5, #aod-offer-heading"),
+            "Ships From": ships_from,
+            "Fulfillment": "Amazon" if ships_from.lower().startswith("amazon") else "Merchant"
+        }
@@ -0,0 +1,185 @@
+import sys
+import threading
+from array import array
+from collections.abc import Mapping
+
+# Fields (nearly) every product has, stored in slots instead of a per-product dict
+FIXED_FIELDS = {
+    "ASIN": "asin",
+    "URL": "url",
+    "Timestamp": "timestamp",
+    "Fetch Tier": "fetch_tier",
+    "Title": "title",
+    "Description": "description",
+    "Bullet Points": "bullet_points",
+    "Current Price": "current_price",
+    "Original Price (MRP)": "original_price",
+    "Discount Percentage": "discount_percentage",
+    "Availability": "availability",
+    "Delivery Date Raw": "delivery_raw",
+    "Delivery Date Parsed": "delivery_parsed",
+    "Delivery Start": "delivery_start",
+    "Delivery End": "delivery_end",
+    "Main Image": "main_image",
+    "Image URLs": "image_urls",
+    "Parent ASIN": "parent_asin",
+    "Variation ASINs": "variation_asins",
+    "Variation Attributes": "variation_attributes",
+}
+
+BULLET_PREFIX = "Bullet Point "
+TECH_PREFIX = "Tech_"
+
+# Tech_* column names are stored once here; records keep only their indexes
+_tech_keys = []
+_tech_index = {}
+_tech_lock = threading.Lock()
+EMPTY_IDS = array("I")
+
+
+def _tech_key_id(key):
+    index = _tech_index.get(key)
+    if index is None:
+        with _tech_lock:
+            index = _tech_index.get(key)
+            if index is None:
+                index = len(_tech_keys)
+                _tech_keys.append(sys.intern(key))
+                _tech_index[_tech_keys[index]] = index
+    return index
+
+
+class ProductRecord(Mapping):
+    """Memory-compact, read-only view of a scraped product with the same keys as the plain dict
+
+    Fixed fields live in slots, "Bullet Point N" values in a tuple, Tech_* details in a packed
+    sparse store (key indexes into a shared table plus a value tuple) and anything else
+    (listing, offer fields, ...) in a flat (key, value, key, value, ...) tuple. Absent fields
+    take no space.
+    """
+
+    __slots__ = tuple(FIXED_FIELDS.values()) + ("bullets", "tech_ids", "tech_values", "extra")
+
+    def __init__(self):
+        for slot in FIXED_FIELDS.values():
+            setattr(self, slot, None)
+        self.bullets = ()
+        self.tech_ids = EMPTY_IDS
+        self.tech_values = ()
+        self.extra = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from the scraper's dict shape"""
+        record = cls()
+        bullets = {}
+        tech_ids, tech_values = [], []
+        extra = []
+        for key, value in data.items():
+            slot = FIXED_FIELDS.get(key)
+            if slot is not None:
+                setattr(record, slot, value)
+            elif key.startswith(TECH_PREFIX):
+                tech_ids.append(_tech_key_id(key))
+                tech_values.append(value)
+            elif key.startswith(BULLET_PREFIX) and key[len(BULLET_PREFIX):].isdigit():
+                bullets[int(key[len(BULLET_PREFIX):])] = value
+            else:
+                extra.extend((sys.intern(key), value))
+
+        # Bullet numbers are contiguous from 1 in practice; anything else is kept verbatim
+        if bullets and sorted(bullets) == list(range(1, len(bullets) + 1)):
+            record.bullets = tuple(bullets[i] for i in range(1, len(bullets) + 1))
+        else:
+            for i, value in bullets.items():
+                extra.extend((sys.intern(f"{BULLET_PREFIX}{i}"), value))
+        if tech_ids:
+            # Built in one go so the array isn't over-allocated
+            record.tech_ids = array("I", tech_ids)
+            record.tech_values = tuple(tech_values)
+        record.extra = tuple(extra)
+        return record
+
+    def items(self):
+        for key, slot in FIXED_FIELDS.items():
+            value = getattr(self, slot)
+            if value is not None:
+                yield key, value
+        for i, bullet in enumerate(self.bullets, 1):
+            yield f"{BULLET_PREFIX}{i}", bullet
+        for key_id, value in zip(self.tech_ids, self.tech_values):
+            yield _tech_keys[key_id], value
+        extra = self.extra
+        for i in range(0, len(extra), 2):
+            yield extra[i], extra[i + 1]
+
+    def __iter__(self):
+        return (key for key, _ in self.items())
+
+    def __len__(self):
+        fixed = sum(getattr(self, slot) is not None for slot in FIXED_FIELDS.values())
+        return fixed + len(self.bullets) + len(self.tech_values) + len(self.extra) // 2
+
+    def __getitem__(self, key):
+        slot = FIXED_FIELDS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if key.startswith(TECH_PREFIX):
+            key_id = _tech_index.get(key)
+            if key_id is not None:
+                for i, stored_id in enumerate(self.tech_ids):
+                    if stored_id == key_id:
+                        return self.tech_values[i]
+        elif key.startswith(BULLET_PREFIX) and key[len(BULLET_PREFIX):].isdigit():
+            number = int(key[len(BULLET_PREFIX):])
+            if 1 <= number <= len(self.bullets):
+                return self.bullets[number - 1]
+        extra = self.extra
+        for i in range(0, len(extra), 2):
+            if extra[i] == key:
+                return extra[i + 1]
+        raise KeyError(key)
+
+    def to_dict(self):
+        """Plain dict in the scraper's original shape (for JSON, sessions and templates)"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"<ProductRecord {self.asin}>"
+
+
+def as_record(product):
+    return product if isinstance(product, ProductRecord) else ProductRecord.from_dict(product)
+
+
+def product_columns(products):
+    """Column-wise {column: [values]} for a batch of records or dicts, ready for pandas.DataFrame
+
+    Avoids building a temporary dict per product; missing values are None.
+    """
+    records = [as_record(p) for p in products]
+    count = len(records)
+    columns = {}
+
+    def column(key):
+        values = columns.get(key)
+        if values is None:
+            values = columns[key] = [None] * count
+        return values
+
+    for key, slot in FIXED_FIELDS.items():
+        values = [getattr(r, slot) for r in records]
+        if any(v is not None for v in values):
+            columns[key] = values
+    for row, record in enumerate(records):
+        for i, bullet in enumerate(record.bullets, 1):
+            column(f"{BULLET_PREFIX}{i}")[row] = bullet
+        for key_id, value in zip(record.tech_ids, record.tech_values):
+            column(_tech_keys[key_id])[row] = value
+        extra = record.extra
+        for i in range(0, len(extra), 2):
+            column(extra[i])[row] = extra[i + 1]
+    return columns
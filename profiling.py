@@ -0,0 +1,143 @@
+import cProfile
+import glob
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Shared no-op context used when a scrape is not being traced
+NO_SPAN = nullcontext()
+
+
+def no_span(name):
+    """Span factory used when profiling is off - returns a shared no-op context"""
+    return NO_SPAN
+
+
+class ScrapeTrace:
+    """Lightweight span trace for a single scrape (fetch -> parse -> each extractor)"""
+
+    def __init__(self, asin):
+        self.asin = asin
+        self.started = time.perf_counter()
+        self.spans = []
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({
+                "name": name,
+                "start_ms": round((start - self.started) * 1000, 3),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3)
+            })
+
+    def to_dict(self):
+        return {"asin": self.asin, "spans": self.spans}
+
+
+class ScrapeProfiler:
+    """Opt-in profiler that wraps a scrape in cProfile and keeps the slowest recent runs
+
+    Profiles live in profiles_dir (shared by all workers), pruned to the newest
+    `max_profiles` and to those younger than `max_age` seconds (None = no age limit).
+    """
+
+    def __init__(self, profiles_dir="profiles", sample_rate=0.0, max_profiles=200, max_age=None):
+        self.profiles_dir = profiles_dir
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def should_profile(self, requested=False):
+        """Decide whether to profile this scrape: explicit request or sampling rate"""
+        if requested:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def run(self, asin, func, *args, **kwargs):
+        """Run func(*args, trace=..., **kwargs) under cProfile and save the results"""
+        if not os.path.exists(self.profiles_dir):
+            os.makedirs(self.profiles_dir)
+
+        trace = ScrapeTrace(asin)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            return func(*args, trace=trace, **kwargs)
+        finally:
+            profiler.disable()
+            total_ms = round((time.perf_counter() - start) * 1000, 3)
+            self._save(asin, profiler, trace, total_ms)
+
+    def _save(self, asin, profiler, trace, total_ms):
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        base = os.path.join(self.profiles_dir, f"scrape_{asin}_{stamp}")
+
+        try:
+            profiler.dump_stats(f"{base}.prof")
+
+            # Keep a human-readable summary of the top functions alongside the binary profile
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                stats = pstats.Stats(profiler, stream=f)
+                stats.sort_stats("cumulative").print_stats(30)
+
+            record = {
+                "asin": asin,
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "total_ms": total_ms,
+                "profile": f"{base}.prof",
+                "spans": trace.spans
+            }
+            with open(f"{base}.json", "w", encoding="utf-8") as f:
+                json.dump(record, f, indent=2)
+        except OSError as e:
+            logging.error(f"Failed to save profile for ASIN {asin}: {e}")
+            return
+
+        logging.info(f"Profiled scrape for ASIN {asin} in {total_ms} ms ({base}.prof)")
+        self._prune()
+
+    def _records(self):
+        """(mtime, path) of every saved profile record, newest first"""
+        records = []
+        for path in glob.glob(os.path.join(self.profiles_dir, "scrape_*.json")):
+            try:
+                records.append((os.path.getmtime(path), path))
+            except OSError:
+                continue  # removed by another worker's prune
+        return sorted(records, reverse=True)
+
+    def _prune(self):
+        """Delete profiles beyond max_profiles or older than max_age, with their .prof/.txt files"""
+        cutoff = time.time() - self.max_age if self.max_age else None
+        with self._lock:
+            for index, (mtime, path) in enumerate(self._records()):
+                if index < self.max_profiles and (cutoff is None or mtime >= cutoff):
+                    continue
+                base = path[:-len(".json")]
+                for extension in (".json", ".prof", ".txt"):
+                    try:
+                        os.remove(base + extension)
+                    except OSError:
+                        pass
+
+    def slowest(self, limit=10):
+        """Return the slowest profiled scrapes kept on disk (from every worker)"""
+        records = []
+        for _, path in self._records():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    records.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # pruned or still being written
+        return sorted(records, key=lambda r: r.get("total_ms", 0), reverse=True)[:limit]
@@ -0,0 +1,130 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from broker import _Transaction
+from product_record import ProductRecord, as_record
+
+# Columns the results view can sort by; anything else falls back to scrape order
+SORTABLE_FIELDS = ("ASIN", "Title", "Current Price", "Discount Percentage", "Delivery Date Parsed", "Timestamp")
+# Fields searched by the results view's filter box
+SEARCH_FIELDS = ("ASIN", "Title", "Parent ASIN")
+
+
+def _sort_key(field):
+    numeric = field in ("Current Price", "Discount Percentage")
+
+    def key(record):
+        value = record.get(field)
+        if numeric:
+            # "₹1,299.00" / "25%" -> 1299.0 / 25.0; missing values sort last
+            digits = "".join(c for c in str(value or "") if c.isdigit() or c == ".")
+            try:
+                return (0, float(digits))
+            except ValueError:
+                return (1, 0.0)
+        return (value is None or value == "N/A", str(value or "").lower())
+    return key
+
+
+class ResultStore:
+    """Keeps recent scrape results server-side so pages and downloads reference them by ID
+
+    Result sets live in an SQLite file rather than process memory, so a follow-up request
+    (paging, download) can be served by any gunicorn worker, not just the one that scraped.
+    """
+
+    def __init__(self, path="results.db", max_results=50):
+        self.path = path
+        self.max_results = max_results
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS result_sets (
+                    id TEXT PRIMARY KEY,
+                    products TEXT NOT NULL,
+                    saved REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_result_sets_saved ON result_sets (saved)")
+            # Retry history of bulk jobs, readable from whichever worker gets the status request
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS retry_snapshots (
+                    job_id TEXT PRIMARY KEY,
+                    snapshot TEXT NOT NULL,
+                    saved REAL NOT NULL
+                )
+            """)
+
+    def _conn(self):
+        # One connection per thread and process; connections must not cross a fork or a thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return _Transaction(conn)
+
+    def save(self, products, result_id=None):
+        """Store a batch of products (records or dicts) and return its result ID"""
+        result_id = result_id or uuid.uuid4().hex[:12]
+        body = json.dumps([as_record(p).to_dict() for p in products], ensure_ascii=False, default=str)
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO result_sets (id, products, saved) VALUES (?, ?, ?)",
+                         (result_id, body, time.time()))
+            # Keep only the most recent result sets
+            conn.execute("DELETE FROM result_sets WHERE id NOT IN "
+                         "(SELECT id FROM result_sets ORDER BY saved DESC LIMIT ?)", (self.max_results,))
+        return result_id
+
+    def get(self, result_id):
+        """Stored products as ProductRecords, or None for an unknown/expired ID"""
+        with self._conn() as conn:
+            row = conn.execute("SELECT products FROM result_sets WHERE id = ?", (result_id,)).fetchone()
+        if row is None:
+            return None
+        return [ProductRecord.from_dict(p) for p in json.loads(row[0])]
+
+    def save_retries(self, job_id, snapshot):
+        """Store the latest retry snapshot of a bulk job (see RetryScheduler.snapshot)"""
+        body = json.dumps(snapshot, ensure_ascii=False, default=str)
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO retry_snapshots (job_id, snapshot, saved) VALUES (?, ?, ?)",
+                         (job_id, body, time.time()))
+            conn.execute("DELETE FROM retry_snapshots WHERE job_id NOT IN "
+                         "(SELECT job_id FROM retry_snapshots ORDER BY saved DESC LIMIT ?)", (self.max_results,))
+
+    def get_retries(self, job_id):
+        """A bulk job's latest retry snapshot, or None for an unknown/expired job"""
+        with self._conn() as conn:
+            row = conn.execute("SELECT snapshot FROM retry_snapshots WHERE job_id = ?", (job_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def page(self, result_id, page=1, per_page=20, sort=None, order="asc", query=None):
+        """Return one page of a stored result after server-side filtering and sorting, or None"""
+        records = self.get(result_id)
+        if records is None:
+            return None
+
+        if query:
+            needle = query.lower()
+            records = [r for r in records
+                       if any(needle in str(r.get(field, "")).lower() for field in SEARCH_FIELDS)]
+        if sort in SORTABLE_FIELDS:
+            records = sorted(records, key=_sort_key(sort), reverse=(order == "desc"))
+
+        total = len(records)
+        pages = max(1, -(-total // per_page))
+        page = max(1, min(page, pages))
+        start = (page - 1) * per_page
+        return {
+            "result_id": result_id,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "products": [r.to_dict() for r in records[start:start + per_page]]
+        }
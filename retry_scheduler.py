@@ -0,0 +1,108 @@
+import heapq
+import random
+import threading
+import time
+from datetime import datetime
+
+
+class RetryPolicy:
+    """Per-job retry settings: exponential backoff with jitter, capped attempts and an overall deadline"""
+
+    def __init__(self, max_attempts=4, base_delay=10, max_delay=300, jitter=0.5, deadline=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline  # Seconds from job start after which no more retries are scheduled
+
+    def backoff(self, attempt):
+        """Delay before the retry following the given (1-based) failed attempt"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class RetryScheduler:
+    """Delayed-retry queue so failed fetches wait without blocking work on other items"""
+
+    def __init__(self, policy=None):
+        self.policy = policy or RetryPolicy()
+        self.started = time.monotonic()
+        self._heap = []  # (due_time, sequence, key)
+        self._sequence = 0
+        self._attempts = {}
+        self._history = {}
+        self.exhausted = []
+        self._lock = threading.Lock()
+
+    def record_success(self, key):
+        with self._lock:
+            self._attempts[key] = self._attempts.get(key, 0) + 1
+            self._history.setdefault(key, []).append({
+                "attempt": self._attempts[key],
+                "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "result": "success"
+            })
+
+    def record_failure(self, key, error=None):
+        """Record a failed attempt and schedule a retry; returns False once the item is given up"""
+        now = time.monotonic()
+        with self._lock:
+            attempt = self._attempts.get(key, 0) + 1
+            self._attempts[key] = attempt
+            entry = {
+                "attempt": attempt,
+                "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "result": "failed",
+                "error": error or "unknown"
+            }
+            self._history.setdefault(key, []).append(entry)
+
+            if attempt >= self.policy.max_attempts:
+                entry["gave_up"] = "max attempts reached"
+                self.exhausted.append(key)
+                return False
+
+            delay = self.policy.backoff(attempt)
+            if self.policy.deadline is not None and (now + delay) - self.started > self.policy.deadline:
+                entry["gave_up"] = "job deadline reached"
+                self.exhausted.append(key)
+                return False
+
+            entry["retry_in"] = round(delay, 2)
+            self._sequence += 1
+            heapq.heappush(self._heap, (now + delay, self._sequence, key))
+            return True
+
+    def pop_due(self, now=None):
+        """Return the next item whose retry time has arrived, or None"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._heap and self._heap[0][0] <= now:
+                return heapq.heappop(self._heap)[2]
+        return None
+
+    def next_due_in(self):
+        """Seconds until the earliest pending retry is due (None if nothing is pending)"""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def pending(self):
+        with self._lock:
+            return len(self._heap)
+
+    def history(self, key=None):
+        with self._lock:
+            if key is not None:
+                return list(self._history.get(key, []))
+            return {k: list(v) for k, v in self._history.items()}
+
+    def snapshot(self):
+        """Pending count, given-up items and per-item history as one JSON-serializable dict"""
+        with self._lock:
+            return {
+                "pending": len(self._heap),
+                "exhausted": list(self.exhausted),
+                "history": {k: list(v) for k, v in self._history.items()}
+            }
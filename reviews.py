@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from listing_crawler import ASIN_RE
+
+RATING_RE = re.compile(r'(\d+(?:[.,]\d+)?) out of 5')
+
+
+class ReviewScraper:
+    """Streams reviews page by page so products with thousands of reviews never sit in memory at once"""
+
+    def __init__(self, scraper, output_dir="reviews", checkpoint_file="reviews/checkpoints.json"):
+        self.scraper = scraper
+        self.output_dir = output_dir
+        self.checkpoint_file = checkpoint_file
+        self._checkpoint_lock = threading.Lock()
+
+    def reviews_url(self, asin, page):
+        return f"{self.scraper.base_url}/product-reviews/{asin}?sortBy=recent&pageNumber={page}"
+
+    def iter_reviews(self, asin, max_pages=None, since_id=None):
+        """Yield reviews newest first, stopping at the last page or at since_id (incremental mode)"""
+        page = 1
+        while max_pages is None or page <= max_pages:
+            response = self.scraper._make_request(self.reviews_url(asin, page))
+            if not response:
+                logging.warning(f"Failed to retrieve reviews page {page} for ASIN: {asin}")
+                return
+
+            soup = BeautifulSoup(response.text, "html.parser")
+            reviews = soup.select('[data-hook="review"]')
+            if not reviews:
+                return
+
+            for element in reviews:
+                review = self._parse_review(asin, element)
+                if since_id and review["Review ID"] == since_id:
+                    logging.info(f"Reached last seen review {since_id} for ASIN {asin}")
+                    return
+                yield review
+
+            # No "next" link means this was the last page
+            if not soup.select_one("li.a-last a"):
+                return
+            page += 1
+
+    def _parse_review(self, asin, element):
+        def text(selector):
+            found = element.select_one(selector)
+            return found.get_text(" ", strip=True) if found else "N/A"
+
+        rating = element.select_one('[data-hook="review-star-rating"], [data-hook="cmps-review-star-rating"]')
+        match = RATING_RE.search(rating.get_text()) if rating else None
+
+        # The title link also contains the star text; the last span holds the title itself
+        title = element.select('[data-hook="review-title"] span')
+        return {
+            "ASIN": asin,
+            "Review ID": element.get("id", "N/A"),
+            "Rating": match.group(1) if match else "N/A",
+            "Title": title[-1].get_text(strip=True) if title else "N/A",
+            "Author": text(".a-profile-name"),
+            "Date": text('[data-hook="review-date"]'),
+            "Verified Purchase": element.select_one('[data-hook="avp-badge"]') is not None,
+            "Body": text('[data-hook="review-body"]'),
+            "Helpful Votes": text('[data-hook="helpful-vote-statement"]')
+        }
+
+    def _load_checkpoints(self):
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        with open(self.checkpoint_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, asin, review_id):
+        with self._checkpoint_lock:
+            checkpoints = self._load_checkpoints()
+            checkpoints[asin] = review_id
+            os.makedirs(os.path.dirname(self.checkpoint_file) or ".", exist_ok=True)
+            with open(self.checkpoint_file, "w", encoding="utf-8") as f:
+                json.dump(checkpoints, f, indent=2)
+
+    def scrape_to_ndjson(self, asin, max_pages=None, incremental=False):
+        """Append an ASIN's reviews to reviews/<asin>.ndjson as they arrive, yielding each one"""
+        if not ASIN_RE.match(asin):
+            # The ASIN is used as a file name; never let it point outside output_dir
+            raise ValueError(f"Invalid ASIN: {asin!r}")
+        since_id = self._load_checkpoints().get(asin) if incremental else None
+        os.makedirs(self.output_dir, exist_ok=True)
+        newest_id = None
+        count = 0
+
+        with open(os.path.join(self.output_dir, f"{asin}.ndjson"), "a", encoding="utf-8") as f:
+            for review in self.iter_reviews(asin, max_pages=max_pages, since_id=since_id):
+                if newest_id is None:
+                    newest_id = review["Review ID"]
+                f.write(json.dumps(review, ensure_ascii=False) + "\n")
+                count += 1
+                yield review
+
+        # Remember the newest review so the next incremental run stops there
+        if newest_id:
+            self._save_checkpoint(asin, newest_id)
+        logging.info(f"Wrote {count} reviews for ASIN {asin}")
+
+    def stream_many(self, asins, workers=3, max_pages=None, incremental=False):
+        """Scrape several ASINs concurrently, yielding reviews from whichever finishes a page first"""
+        results = queue.Queue(maxsize=500)  # Bounded so slow consumers apply back-pressure
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            # Give up if the consumer went away, rather than blocking on a full queue forever
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def worker(asin):
+            try:
+                for review in self.scrape_to_ndjson(asin, max_pages=max_pages, incremental=incremental):
+                    if not put(review):
+                        return
+            except Exception as e:
+                logging.error(f"Error scraping reviews for {asin}: {str(e)}")
+            finally:
+                put(done)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for asin in asins:
+                executor.submit(worker, asin)
+            remaining = len(asins)
+            while remaining:
+                item = results.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
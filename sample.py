@@ -9,15 +9,10 @@ from requests.exceptions import RequestException
 import logging
 import os
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("amazon_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
+from logging_setup import configure_logging
+
+# Configure logging - records are queued and written (as rotated JSON lines) on a background thread
+configure_logging("amazon_scraper.log")
 
 class AmazonScraper:
     def __init__(self, country="in", use_proxy=False, proxy_list=None):
@@ -1,28 +1,27 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from bs4 import BeautifulSoup
-import time, json
+import json
 
-# Setup Chrome Options
-chrome_options = Options()
-chrome_options.add_argument("--headless")
-chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--log-level=3")
+from browser_pool import BrowserPool
 
-# Initialize WebDriver
-service = Service("chromedriver.exe")  # Ensure chromedriver.exe is in your project folder
-driver = webdriver.Chrome(service=service, options=chrome_options)
+# Shared pool of warm drivers, created on first use
+# Ensure chromedriver.exe is in your project folder
+_pool = None
 
-def scrape_amazon_product(asin, country_code="com"):
+def get_browser_pool(size=2, max_pages=50):
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(size=size, max_pages=max_pages, driver_path="chromedriver.exe")
+    return _pool
+
+def scrape_amazon_product(asin, country_code="com", pool=None):
     url = f"https://www.amazon.{country_code}/dp/{asin}"
-    driver.get(url)
-    time.sleep(5)  # Allow JavaScript to load
+    pool = pool or get_browser_pool()
+    # Waits for the elements we read instead of a fixed sleep
+    page_source = pool.get_page_source(url)
+    return parse_product_page(asin, page_source)
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+def parse_product_page(asin, page_source):
+    soup = BeautifulSoup(page_source, "html.parser")
 
     product_details = {
         "asin": asin,
@@ -151,9 +150,14 @@ def scrape_amazon_product(asin, country_code="com"):
 
     return product_details
 
-# Run the scraper
-asin = "B0C9WHSZZN"  # Replace with actual ASIN
-data = scrape_amazon_product(asin)
-print(json.dumps(data, indent=4))
-
-driver.quit()
+if __name__ == "__main__":
+    # Run the scraper
+    asins = ["B0C9WHSZZN"]  # Replace with actual ASINs
+    pool = get_browser_pool()
+    pool.warm()
+    try:
+        for asin in asins:
+            data = scrape_amazon_product(asin, pool=pool)
+            print(json.dumps(data, indent=4))
+    finally:
+        pool.close()
@@ -0,0 +1,77 @@
+import threading
+from collections import defaultdict
+
+
+class SelectorStats:
+    """Per-marketplace hit/miss counters for extractor selectors with optional adaptive ordering"""
+
+    def __init__(self, adaptive=False, pinned=None, reorder_every=50):
+        self.adaptive = adaptive
+        # {field: selector} - a pinned selector is always tried first regardless of hit rate
+        self.pinned = dict(pinned or {})
+        self.reorder_every = reorder_every
+        self._counts = defaultdict(lambda: [0, 0])  # (marketplace, field, selector) -> [hits, misses]
+        self._order_cache = {}
+        self._records_since_reorder = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, marketplace, field, selector, hit):
+        """Record whether a selector produced a value"""
+        with self._lock:
+            self._counts[(marketplace, field, selector)][0 if hit else 1] += 1
+            self._records_since_reorder[(marketplace, field)] += 1
+
+    def pin(self, field, selector):
+        with self._lock:
+            self.pinned[field] = selector
+            self._order_cache.clear()
+
+    def unpin(self, field):
+        with self._lock:
+            self.pinned.pop(field, None)
+            self._order_cache.clear()
+
+    def order(self, marketplace, field, selectors):
+        """Return the selectors in the order they should be tried"""
+        pinned = self.pinned.get(field)
+        if not self.adaptive and not pinned:
+            return selectors
+
+        key = (marketplace, field)
+        with self._lock:
+            cached = self._order_cache.get(key)
+            if cached is not None and cached[0] == tuple(selectors) \
+                    and self._records_since_reorder[key] < self.reorder_every:
+                return cached[1]
+
+            ordered = list(selectors)
+            if self.adaptive:
+                # Smoothed hit rate so unseen selectors keep their original position; sort is stable
+                def hit_rate(selector):
+                    hits, misses = self._counts.get((marketplace, field, selector), (0, 0))
+                    return (hits + 1) / (hits + misses + 2)
+                ordered.sort(key=hit_rate, reverse=True)
+
+            if pinned:
+                ordered = [pinned] + [s for s in ordered if s != pinned]
+
+            self._order_cache[key] = (tuple(selectors), ordered)
+            self._records_since_reorder[key] = 0
+            return ordered
+
+    def snapshot(self, marketplace=None):
+        """Return counters as {marketplace: {field: {selector: {...}}}}"""
+        with self._lock:
+            items = list(self._counts.items())
+
+        result = {}
+        for (market, field, selector), (hits, misses) in items:
+            if marketplace and market != marketplace:
+                continue
+            total = hits + misses
+            result.setdefault(market, {}).setdefault(field, {})[selector] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 4) if total else None
+            }
+        return result
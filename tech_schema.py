@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+
+# Spellings Amazon uses for the same attribute across categories and marketplaces -> one canonical name
+DEFAULT_SYNONYMS = {
+    "item model number": "Model Number",
+    "model number": "Model Number",
+    "item part number": "Part Number",
+    "part number": "Part Number",
+    "weight": "Item Weight",
+    "item weight": "Item Weight",
+    "product weight": "Item Weight",
+    "product dimensions": "Product Dimensions",
+    "item dimensions": "Product Dimensions",
+    "item dimensions l x w x h": "Product Dimensions",
+    "package dimensions": "Package Dimensions",
+    "brand name": "Brand",
+    "manufacturer name": "Manufacturer",
+    "color": "Colour",
+    "colour name": "Colour",
+    "color name": "Colour",
+    "country of origin": "Country of Origin",
+    "country origin": "Country of Origin",
+    "amazon bestsellers rank": "Best Sellers Rank",
+    "best sellers rank": "Best Sellers Rank",
+    "net quantity": "Net Quantity",
+    "included components": "Included Components",
+    "components included": "Included Components",
+}
+
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_key(raw_key):
+    """Case/punctuation-insensitive form of a detail label, e.g. "Country Of Origin ‏ : ‎" -> "country of origin" """
+    return " ".join(NON_WORD_RE.sub(" ", raw_key).lower().split())
+
+
+class TechSchemaRegistry:
+    """Maps raw technical-detail labels to stable Tech_* column names, persisted across runs
+
+    Labels that normalize to the same text, or are listed as synonyms, share one column, so
+    bulk exports keep a bounded set of columns instead of one per spelling. The JSON file can
+    be edited by hand to merge further aliases.
+    """
+
+    def __init__(self, path=None, synonyms=None):
+        self.path = path
+        self._aliases = dict(DEFAULT_SYNONYMS if synonyms is None else synonyms)
+        self._columns = {}  # raw label -> column, memoized so repeat pages skip the cleanup entirely
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._aliases.update(json.load(f).get("aliases", {}))
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not load tech schema {path}: {str(e)}")
+
+    def column(self, raw_key):
+        """Return the Tech_* column for a raw label, or None for an empty label"""
+        column = self._columns.get(raw_key)
+        if column is not None:
+            return column
+
+        normalized = normalize_key(raw_key)
+        if not normalized:
+            return None
+
+        with self._lock:
+            name = self._aliases.get(normalized)
+            if name is None:
+                # First spelling seen becomes the canonical name for this label
+                name = " ".join(NON_WORD_RE.sub(" ", raw_key).split())
+                self._aliases[normalized] = name
+                self._save()
+            column = "Tech_" + name.replace(" ", "_")
+            self._columns[raw_key] = column
+        return column
+
+    def columns(self):
+        """Sorted set of canonical columns known to the registry"""
+        with self._lock:
+            return sorted({"Tech_" + name.replace(" ", "_") for name in self._aliases.values()})
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            # Merge with the file first so several processes sharing it don't drop each other's labels
+            aliases = {}
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    aliases = json.load(f).get("aliases", {})
+            aliases.update(self._aliases)
+            self._aliases = aliases
+
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"aliases": dict(sorted(aliases.items()))}, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not save tech schema {self.path}: {str(e)}")
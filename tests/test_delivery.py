@@ -0,0 +1,29 @@
+from datetime import date
+
+import pytest
+
+from delivery import parse_delivery
+
+SCRAPED_ON = date(2025, 3, 1)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Arrives: Mar 4 - 6", (date(2025, 3, 4), date(2025, 3, 6))),
+    ("Get it Mar 4 - 7", (date(2025, 3, 4), date(2025, 3, 7))),
+    ("FREE delivery March 10 - 14", (date(2025, 3, 10), date(2025, 3, 14))),
+    ("Mar 30 - Apr 2", (date(2025, 3, 30), date(2025, 4, 2))),
+    ("4 - 6 March", (date(2025, 3, 4), date(2025, 3, 6))),
+    ("Mar 4 - Wednesday, Mar 6", (date(2025, 3, 4), date(2025, 3, 6))),
+    ("Tuesday, Mar 4. Order within 3 hrs", (date(2025, 3, 4), date(2025, 3, 4))),
+])
+def test_parse_delivery_ranges(text, expected):
+    assert parse_delivery(text, scraped_on=SCRAPED_ON) == expected
+
+
+def test_parse_delivery_rolls_over_year():
+    assert parse_delivery("Jan 2 - 4", scraped_on=date(2025, 12, 30)) == (date(2026, 1, 2), date(2026, 1, 4))
+
+
+def test_parse_delivery_without_date():
+    assert parse_delivery("N/A", scraped_on=SCRAPED_ON) is None
+    assert parse_delivery("Currently unavailable", scraped_on=SCRAPED_ON) is None
@@ -0,0 +1,30 @@
+import math
+import warnings
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from normalize import normalize_prices
+
+
+def test_normalize_prices_with_missing_price():
+    df = pd.DataFrame({
+        "URL": ["https://www.amazon.in/dp/B0CGW18S6Y", "https://www.amazon.de/dp/B0CGW18S6Z",
+                "https://www.amazon.in/dp/B0CGW18S70"],
+        "Current Price": ["₹1,299.00", "1.299,00 €", "N/A"],
+        "Original Price (MRP)": ["₹1,999.00", "N/A", "N/A"],
+    })
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = normalize_prices(df)
+
+    assert result["Price Value"].dtype == "float64"
+    assert result["Price Value"].iloc[0] == 1299.0
+    assert result["Price Value"].iloc[1] == 1299.0
+    assert math.isnan(result["Price Value"].iloc[2])
+    assert result["MRP Value"].iloc[0] == 1999.0
+    assert list(result["Currency"]) == ["INR", "EUR", "INR"]
+    assert result["Discount Value"].iloc[0] == 35.0
+    assert math.isnan(result["Discount Value"].iloc[2])
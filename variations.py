@@ -0,0 +1,54 @@
+import threading
+
+# Fields that are the same across a variation family - copied from the first sibling scraped
+# instead of being extracted again for every child
+SHARED_FIELD_PREFIXES = ("Bullet Point",)
+SHARED_FIELDS = ("Description", "Parent ASIN", "Variation ASINs")
+
+
+class VariationFamilyTracker:
+    """Expands a job to whole variation families while skipping ASINs already scraped or queued"""
+
+    def __init__(self, asins=None):
+        self._seen = set(asins or [])
+        self._parent_of = {}
+        self._shared = {}
+        self._lock = threading.Lock()
+
+    def is_seen(self, asin):
+        with self._lock:
+            return asin in self._seen
+
+    def mark_seen(self, asin):
+        with self._lock:
+            self._seen.add(asin)
+
+    def register(self, product_data):
+        """Record a scraped product's family; returns sibling ASINs not yet scraped or queued"""
+        parent = product_data.get("Parent ASIN")
+        children = [a.strip() for a in product_data.get("Variation ASINs", "").split(",") if a.strip()]
+        if not parent or not children:
+            return []
+
+        with self._lock:
+            self._seen.add(product_data.get("ASIN"))
+            if parent not in self._shared:
+                self._shared[parent] = {
+                    key: value for key, value in product_data.items()
+                    if key in SHARED_FIELDS or key.startswith(SHARED_FIELD_PREFIXES)
+                }
+            new_children = []
+            for child in children:
+                self._parent_of[child] = parent
+                if child not in self._seen:
+                    self._seen.add(child)
+                    new_children.append(child)
+        return new_children
+
+    def shared_fields(self, asin):
+        """Parent-level fields already known for this ASIN's family (None if unknown)"""
+        with self._lock:
+            parent = self._parent_of.get(asin)
+            if parent is None:
+                return None
+            return dict(self._shared.get(parent, {}))
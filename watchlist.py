@@ -0,0 +1,373 @@
+import argparse
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from broker import _Transaction
+from logging_setup import configure_logging, log_context
+
+
+class WatchlistStore:
+    """Persistent watchlists: per-ASIN refresh interval, priority, next due time and last result"""
+
+    def __init__(self, path="watchlist.db"):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS watch_items (
+                    watchlist TEXT NOT NULL,
+                    asin TEXT NOT NULL,
+                    marketplace TEXT NOT NULL,
+                    interval REAL NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    next_due REAL NOT NULL,
+                    last_scraped REAL,
+                    last_status TEXT,
+                    last_error TEXT,
+                    last_result TEXT,
+                    PRIMARY KEY (watchlist, asin, marketplace)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_watch_due ON watch_items (next_due)")
+
+    def _conn(self):
+        # One connection per thread and process; connections must not cross a fork or a thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return _Transaction(conn)
+
+    def add(self, watchlist, asins, interval, priority=0, marketplace="in"):
+        """Add or update ASINs on a watchlist; first runs are spread across one interval"""
+        now = time.time()
+        rows = [
+            (watchlist, asin, marketplace, interval, priority, now + spread_offset(asin, interval))
+            for asin in asins
+        ]
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO watch_items (watchlist, asin, marketplace, interval, priority, next_due) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (watchlist, asin, marketplace) DO UPDATE SET interval = excluded.interval, "
+                "priority = excluded.priority",
+                rows
+            )
+        return len(rows)
+
+    def remove(self, watchlist, asins=None):
+        with self._conn() as conn:
+            if asins:
+                cursor = conn.executemany(
+                    "DELETE FROM watch_items WHERE watchlist = ? AND asin = ?",
+                    [(watchlist, asin) for asin in asins]
+                )
+            else:
+                cursor = conn.execute("DELETE FROM watch_items WHERE watchlist = ?", (watchlist,))
+        return cursor.rowcount
+
+    def watchlists(self):
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT watchlist, COUNT(*) AS items, MIN(next_due) AS next_due, "
+                "SUM(last_status = 'failed') AS failing FROM watch_items GROUP BY watchlist ORDER BY watchlist"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def items(self, watchlist=None):
+        query = "SELECT * FROM watch_items"
+        params = ()
+        if watchlist:
+            query += " WHERE watchlist = ?"
+            params = (watchlist,)
+        with self._conn() as conn:
+            rows = conn.execute(query + " ORDER BY next_due", params).fetchall()
+        items = []
+        for row in rows:
+            item = dict(row)
+            item["last_result"] = json.loads(item["last_result"]) if item["last_result"] else None
+            items.append(item)
+        return items
+
+    def claim(self, item, next_due):
+        """Move an item's due time forward unless another scheduler got to it first"""
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "UPDATE watch_items SET next_due = ? WHERE watchlist = ? AND asin = ? AND marketplace = ? AND next_due = ?",
+                (next_due, item["watchlist"], item["asin"], item["marketplace"], item["next_due"])
+            )
+        return cursor.rowcount == 1
+
+    def reschedule(self, updates):
+        """Bulk-set next_due for (next_due, watchlist, asin, marketplace) rows (catch-up after downtime)"""
+        with self._conn() as conn:
+            conn.executemany(
+                "UPDATE watch_items SET next_due = ? WHERE watchlist = ? AND asin = ? AND marketplace = ?",
+                updates
+            )
+
+    def record_result(self, item, product_data, error=None):
+        with self._conn() as conn:
+            if product_data:
+                conn.execute(
+                    "UPDATE watch_items SET last_scraped = ?, last_status = 'ok', last_error = NULL, last_result = ? "
+                    "WHERE watchlist = ? AND asin = ? AND marketplace = ?",
+                    (time.time(), json.dumps(product_data, ensure_ascii=False),
+                     item["watchlist"], item["asin"], item["marketplace"])
+                )
+            else:
+                conn.execute(
+                    "UPDATE watch_items SET last_scraped = ?, last_status = 'failed', last_error = ? "
+                    "WHERE watchlist = ? AND asin = ? AND marketplace = ?",
+                    (time.time(), error or "no product data", item["watchlist"], item["asin"], item["marketplace"])
+                )
+
+
+def spread_offset(asin, interval):
+    """Stable per-ASIN offset within the interval so a watchlist's scrapes don't all fall due together"""
+    return (zlib.crc32(asin.encode()) % 1000) / 1000 * interval
+
+
+class RateBudget:
+    """Token bucket: `per_minute` scrapes per minute with bursts of up to `burst`"""
+
+    def __init__(self, per_minute, burst=1):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now):
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, now):
+        self._refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class WatchlistScheduler:
+    """Runs due watchlist scrapes at a smooth rate, highest priority first, within per-marketplace budgets
+
+    Items come from a WatchlistStore (re-read every `reload_interval` seconds so API changes and
+    other processes are picked up). Due items wait in a priority queue; each marketplace has a
+    token-bucket budget. After downtime, overdue items are spread over `catch_up_window` seconds
+    instead of firing at once, and missed cycles are skipped rather than replayed.
+    """
+
+    def __init__(self, store, scrape, budgets=None, default_budget=20, workers=2,
+                 reload_interval=60, catch_up_window=600):
+        self.store = store
+        self.scrape = scrape  # scrape(asin, marketplace) -> product dict or None
+        self.budgets = {m: RateBudget(rate) for m, rate in (budgets or {}).items()}
+        self.default_budget = default_budget
+        self.workers = workers
+        self.reload_interval = reload_interval
+        self.catch_up_window = catch_up_window
+        self.stats = {"scraped": 0, "failed": 0, "deferred_by_budget": 0, "caught_up": 0}
+        self._waiting = []  # (next_due, sequence, item) - not yet due
+        self._ready = []  # (-priority, next_due, sequence, item) - due, waiting for budget
+        self._sequence = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _budget(self, marketplace):
+        budget = self.budgets.get(marketplace)
+        if budget is None:
+            budget = self.budgets[marketplace] = RateBudget(self.default_budget)
+        return budget
+
+    def _push(self, item):
+        self._sequence += 1
+        heapq.heappush(self._waiting, (item["next_due"], self._sequence, item))
+
+    def _reload(self, now):
+        items = self.store.items()
+        overdue = [item for item in items if item["next_due"] < now - item["interval"]]
+        if overdue:
+            # Down for more than a cycle: spread the backlog (highest priority first) over the catch-up window
+            overdue.sort(key=lambda item: (-item["priority"], item["next_due"]))
+            step = self.catch_up_window / len(overdue)
+            updates = []
+            for i, item in enumerate(overdue):
+                item["next_due"] = now + i * step
+                updates.append((item["next_due"], item["watchlist"], item["asin"], item["marketplace"]))
+            self.store.reschedule(updates)
+            self.stats["caught_up"] += len(overdue)
+            logging.info(f"Spreading {len(overdue)} overdue watchlist scrape(s) over {self.catch_up_window}s")
+
+        self._waiting, self._ready = [], []
+        for item in items:
+            self._push(item)
+
+    def _next_ready(self, now):
+        """Pop the highest-priority due item whose marketplace budget allows a scrape now"""
+        while self._waiting and self._waiting[0][0] <= now:
+            next_due, sequence, item = heapq.heappop(self._waiting)
+            heapq.heappush(self._ready, (-item["priority"], next_due, sequence, item))
+
+        deferred = []
+        picked = None
+        while self._ready:
+            entry = heapq.heappop(self._ready)
+            if self._budget(entry[3]["marketplace"]).try_take(time.monotonic()):
+                picked = entry[3]
+                break
+            deferred.append(entry)
+        for entry in deferred:
+            heapq.heappush(self._ready, entry)
+        if deferred and picked is None:
+            self.stats["deferred_by_budget"] += 1
+        return picked
+
+    def _sleep_time(self, now, reload_at):
+        candidates = [reload_at - now]
+        if self._waiting:
+            candidates.append(self._waiting[0][0] - now)
+        if self._ready:
+            monotonic = time.monotonic()
+            candidates.append(min(self._budget(entry[3]["marketplace"]).wait_time(monotonic) for entry in self._ready))
+        return max(0.05, min(candidates))
+
+    def _run_item(self, item):
+        try:
+            with log_context(asin=item["asin"], marketplace=item["marketplace"], stage="watchlist"):
+                product_data = self.scrape(item["asin"], item["marketplace"])
+                self.store.record_result(item, product_data)
+            with self._lock:
+                self.stats["scraped" if product_data else "failed"] += 1
+        except Exception as e:
+            logging.error(f"Watchlist scrape of {item['asin']} failed: {str(e)}")
+            self.store.record_result(item, None, str(e))
+            with self._lock:
+                self.stats["failed"] += 1
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def run(self):
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        reload_at = 0
+        try:
+            while not self._stop.is_set():
+                now = time.time()
+                if now >= reload_at:
+                    self._reload(now)
+                    reload_at = now + self.reload_interval
+
+                with self._lock:
+                    busy = self._in_flight >= self.workers
+                item = None if busy else self._next_ready(now)
+                if item is None:
+                    self._stop.wait(1 if busy else self._sleep_time(now, reload_at))
+                    continue
+
+                # Skip missed cycles: the next run is one interval from the scheduled time, or from now if that's passed
+                next_due = item["next_due"] + item["interval"]
+                if next_due <= now:
+                    next_due = now + item["interval"]
+                if not self.store.claim(item, next_due):
+                    continue  # Removed, or another scheduler process already took this run
+                item = dict(item, next_due=next_due)
+                self._push(item)
+
+                with self._lock:
+                    self._in_flight += 1
+                executor.submit(self._run_item, item)
+        finally:
+            executor.shutdown(wait=True)
+
+    def start(self):
+        """Run the scheduler on a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="watchlist-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiting),
+                "ready": len(self._ready)
+            }
+
+
+def start_when_leader(lock_path, start):
+    """Call start() once this process holds an exclusive lock on lock_path, so one process per host runs it
+
+    Waits on a daemon thread; when the holder exits the OS drops its lock and a waiting process takes over.
+    """
+    try:
+        import fcntl
+    except ImportError:  # No flock (Windows) - single-process dev server, just start
+        start()
+        return
+
+    def wait_for_lock():
+        lock_file = open(lock_path, "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        logging.info(f"Process {os.getpid()} holds {lock_path}; starting")
+        start()
+        # The lock lasts as long as this process; keep the file open
+        wait_for_lock.lock_file = lock_file
+
+    threading.Thread(target=wait_for_lock, name="leader-lock", daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the watchlist scheduler as a standalone process")
+    parser.add_argument("--db", default=os.environ.get("WATCHLIST_DB", "watchlist.db"), help="Watchlist database path")
+    parser.add_argument("--budget", type=int, default=20, help="Scrapes per minute per marketplace")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent scrapes")
+    parser.add_argument("--debug-html-dir", default="debug_html", help="Where fetched pages are saved ('' to disable)")
+    args = parser.parse_args()
+
+    configure_logging("amazon_scraper_watchlist.log")
+
+    from app import AmazonScraper
+    from tech_schema import TechSchemaRegistry
+
+    if args.debug_html_dir:
+        os.makedirs(args.debug_html_dir, exist_ok=True)
+
+    scrapers = {}
+    tech_schema = TechSchemaRegistry("tech_schema.json")
+
+    def scrape(asin, marketplace):
+        if marketplace not in scrapers:
+            scrapers[marketplace] = AmazonScraper(country=marketplace, tech_schema=tech_schema,
+                                                   debug_html_dir=args.debug_html_dir or None)
+        return scrapers[marketplace].get_product(asin)
+
+    scheduler = WatchlistScheduler(WatchlistStore(args.db), scrape, default_budget=args.budget, workers=args.workers)
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+from broker import _Transaction
+from retry_scheduler import RetryPolicy
+
+SIGNATURE_HEADER = "X-Scraper-Signature"
+TIMESTAMP_HEADER = "X-Scraper-Timestamp"
+DELIVERY_HEADER = "X-Scraper-Delivery"
+
+
+def sign(secret, timestamp, body):
+    """HMAC-SHA256 over "<timestamp>.<body>" so a captured delivery can't be replayed later with a new time"""
+    message = f"{timestamp}.".encode("utf-8") + body
+    return "sha256=" + hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret, timestamp, body, signature, tolerance=300):
+    """Check a delivery's signature (receivers should also reject stale timestamps)"""
+    try:
+        if abs(time.time() - int(timestamp)) > tolerance:
+            return False
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), signature or "")
+
+
+class WebhookOutbox:
+    """Persistent outbox of result batches, so undelivered batches survive restarts"""
+
+    def __init__(self, path="webhook_outbox.db"):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS batches (
+                    id TEXT PRIMARY KEY,
+                    job_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt REAL NOT NULL,
+                    last_error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_batches_due ON batches (status, next_attempt)")
+            # Batch numbers per job and URL, so they keep counting across processes and restarts
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sequences (
+                    job_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    sequence INTEGER NOT NULL,
+                    PRIMARY KEY (job_id, url)
+                )
+            """)
+
+    def _conn(self):
+        # One connection per thread and process; connections must not cross a fork or a thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return _Transaction(conn)
+
+    def next_sequence(self, job_id, url):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO sequences (job_id, url, sequence) VALUES (?, ?, 1) "
+                "ON CONFLICT (job_id, url) DO UPDATE SET sequence = sequence + 1",
+                (job_id, url)
+            )
+            row = conn.execute("SELECT sequence FROM sequences WHERE job_id = ? AND url = ?", (job_id, url)).fetchone()
+        return row["sequence"]
+
+    def add(self, job_id, url, body):
+        batch_id = uuid.uuid4().hex
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO batches (id, job_id, url, body, next_attempt, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (batch_id, job_id, url, body, now, now, now)
+            )
+        return batch_id
+
+    def claim_due(self, limit=20, hold=60):
+        """Due batches, held back from other processes for `hold` seconds while this one sends them"""
+        now = time.time()
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT * FROM batches WHERE status = 'pending' AND next_attempt <= ? ORDER BY created LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            # A sender that dies mid-delivery just lets the hold lapse; the batch is then retried
+            conn.executemany("UPDATE batches SET next_attempt = ? WHERE id = ?", [(now + hold, row["id"]) for row in rows])
+        return [dict(row) for row in rows]
+
+    def next_due_in(self):
+        with self._conn() as conn:
+            row = conn.execute("SELECT MIN(next_attempt) AS due FROM batches WHERE status = 'pending'").fetchone()
+        return None if row["due"] is None else max(0.0, row["due"] - time.time())
+
+    def delivered(self, batch_id):
+        with self._conn() as conn:
+            conn.execute("UPDATE batches SET status = 'delivered', attempts = attempts + 1, last_error = NULL, "
+                         "updated = ? WHERE id = ?", (time.time(), batch_id))
+
+    def failed(self, batch_id, error, retry_at=None):
+        """Record a failed attempt; without retry_at the batch is given up (status 'failed')"""
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE batches SET status = ?, attempts = attempts + 1, last_error = ?, next_attempt = ?, updated = ? "
+                "WHERE id = ?",
+                ('pending' if retry_at else 'failed', error, retry_at or time.time(), time.time(), batch_id)
+            )
+
+    def job_status(self, job_id):
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS n FROM batches WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+class WebhookDispatcher:
+    """Buffers bulk results per job and pushes them to callback URLs in signed batches
+
+    A batch is cut when `batch_size` products are buffered or the oldest has waited
+    `batch_seconds`. Batches go to the outbox before sending and are retried with
+    exponential backoff until delivered or out of attempts.
+    """
+
+    def __init__(self, outbox, secret, batch_size=25, batch_seconds=10, retry_policy=None, timeout=10):
+        self.outbox = outbox
+        self.secret = secret
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=8, base_delay=5, max_delay=600)
+        self.timeout = timeout
+        self._buffers = {}  # (job_id, url) -> {"products": [...], "started": t}
+        self._reset()
+        self.stats = {"batches": 0, "delivered": 0, "retried": 0, "failed": 0}
+        # A forked child (e.g. a gunicorn worker of a preloaded app) gets no threads and may inherit
+        # a held lock; start over there and let start() launch its own delivery thread
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, job_id, url, product):
+        """Buffer one product for a job's callback URL"""
+        with self._lock:
+            buffer = self._buffers.setdefault((job_id, url), {"products": [], "started": None})
+            if not buffer["products"]:
+                buffer["started"] = time.monotonic()
+            buffer["products"].append(product)
+            full = len(buffer["products"]) >= self.batch_size
+        if full:
+            self._flush(job_id, url)
+        self.start()
+
+    def finish(self, job_id, url, summary=None):
+        """Flush what's left for a job as its final batch (sent even if empty, carrying the summary)"""
+        self._flush(job_id, url, final=True, summary=summary)
+        with self._lock:
+            self._buffers.pop((job_id, url), None)
+        self.start()
+
+    def _flush(self, job_id, url, final=False, summary=None):
+        with self._lock:
+            buffer = self._buffers.get((job_id, url))
+            products = buffer["products"] if buffer else []
+            if not products and not final:
+                return
+            if buffer:
+                buffer["products"], buffer["started"] = [], None
+            self.stats["batches"] += 1
+
+        sequence = self.outbox.next_sequence(job_id, url)
+        payload = {"job_id": job_id, "batch": sequence, "final": final, "count": len(products), "products": products}
+        if summary:
+            payload["summary"] = summary
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.outbox.add(job_id, url, body)
+        self._wake.set()
+
+    def _flush_expired(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, buffer in self._buffers.items()
+                       if buffer["products"] and now - buffer["started"] >= self.batch_seconds]
+        for job_id, url in expired:
+            self._flush(job_id, url)
+
+    def _deliver(self, batch):
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            TIMESTAMP_HEADER: timestamp,
+            SIGNATURE_HEADER: sign(self.secret, timestamp, batch["body"]),
+            DELIVERY_HEADER: batch["id"]
+        }
+        try:
+            response = requests.post(batch["url"], data=batch["body"], headers=headers, timeout=self.timeout)
+            if 200 <= response.status_code < 300:
+                self.outbox.delivered(batch["id"])
+                with self._lock:
+                    self.stats["delivered"] += 1
+                return
+            error = f"status {response.status_code}"
+        except Exception as e:
+            error = f"request error: {e}"
+
+        attempt = batch["attempts"] + 1
+        if attempt >= self.retry_policy.max_attempts:
+            logging.error(f"Giving up webhook batch {batch['id']} for job {batch['job_id']} after {attempt} attempts: {error}")
+            self.outbox.failed(batch["id"], error)
+            with self._lock:
+                self.stats["failed"] += 1
+        else:
+            delay = self.retry_policy.backoff(attempt)
+            logging.warning(f"Webhook batch {batch['id']} for job {batch['job_id']} failed ({error}); retrying in {delay:.0f}s")
+            self.outbox.failed(batch["id"], error, retry_at=time.time() + delay)
+            with self._lock:
+                self.stats["retried"] += 1
+
+    def run(self):
+        while not self._stop.is_set():
+            self._flush_expired()
+            for batch in self.outbox.claim_due(hold=self.timeout * 3):
+                self._deliver(batch)
+
+            # Sleep until the next retry or buffer deadline, or until a new batch is queued
+            wait = self.batch_seconds
+            next_retry = self.outbox.next_due_in()
+            if next_retry is not None:
+                wait = min(wait, next_retry)
+            self._wake.wait(max(0.1, wait))
+            self._wake.clear()
+
+    def start(self):
+        """Start this process's delivery thread if it isn't running (also resumes batches left in the outbox)"""
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._thread = threading.Thread(target=self.run, name="webhook-delivery", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "buffered": sum(len(b["products"]) for b in self._buffers.values())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local webhook receiver that prints and verifies result batches")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--secret", required=True, help="Shared secret (the app's WEBHOOK_SECRET)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of deliveries to answer with 500")
+    args = parser.parse_args()
+
+    import random
+
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            valid = verify_signature(args.secret, self.headers.get(TIMESTAMP_HEADER), body,
+                                     self.headers.get(SIGNATURE_HEADER))
+            status = 401 if not valid else 500 if random.random() < args.fail_rate else 200
+            payload = json.loads(body) if valid else {}
+            print(f"{self.headers.get(DELIVERY_HEADER)} job={payload.get('job_id')} batch={payload.get('batch')} "
+                  f"count={payload.get('count')} final={payload.get('final')} signature={'ok' if valid else 'BAD'} -> {status}",
+                  flush=True)
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"Receiving webhooks on http://127.0.0.1:{args.port}/", flush=True)
+    HTTPServer(("127.0.0.1", args.port), Receiver).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
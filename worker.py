@@ -0,0 +1,147 @@
+import argparse
+import logging
+import os
+import socket
+import threading
+import uuid
+
+from broker import open_broker
+from logging_setup import configure_logging
+from tech_schema import TechSchemaRegistry
+from webhooks import WebhookDispatcher, WebhookOutbox
+
+
+class ScrapeWorker:
+    """Pulls ASIN tasks from a shared broker, scrapes them and pushes results back"""
+
+    def __init__(self, broker, scraper, worker_id=None, lease_seconds=60, heartbeat_interval=15, idle_sleep=2,
+                 webhooks=None):
+        self.broker = broker
+        self.scraper = scraper
+        self.webhooks = webhooks  # WebhookDispatcher for jobs submitted with a callback_url
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_sleep = idle_sleep
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat(self, task_id, done):
+        """Keep the lease alive while the scrape runs"""
+        while not done.wait(self.heartbeat_interval):
+            if not self.broker.heartbeat(task_id, self.worker_id, self.lease_seconds):
+                logging.warning(f"Lost lease on task {task_id}; another worker may pick it up")
+                return
+
+    def run_once(self):
+        """Lease and process a single task; returns False if the queue was empty"""
+        task = self.broker.lease(self.worker_id, self.lease_seconds)
+        if task is None:
+            return False
+
+        asin = task["asin"]
+        logging.info(f"Worker {self.worker_id} scraping {asin} (job {task['job_id']}, attempt {task['attempt']})")
+
+        callback_url = task["payload"].get("callback_url")
+        if callback_url and not self.webhooks:
+            logging.warning(f"Job {task['job_id']} has a callback URL but this worker has no webhook secret")
+            callback_url = None
+
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task["id"], done), daemon=True)
+        heartbeat.start()
+        try:
+            product_data = self.scraper.get_product(asin, fields=task["payload"].get("fields"))
+            error = None if product_data else self.scraper.last_error() or "no product data"
+        except Exception as e:
+            logging.error(f"Error scraping {asin}: {str(e)}")
+            product_data, error = None, str(e)
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if product_data:
+            reported = self.broker.complete(task["id"], self.worker_id, product_data)
+        else:
+            reported = self.broker.fail(task["id"], self.worker_id, error)
+        if not reported:
+            # Lease expired and the task was handed to another worker, which will report it
+            logging.warning(f"Lost lease on task {task['id']} before reporting it; discarding this attempt")
+            return True
+
+        if callback_url:
+            if product_data:
+                self.webhooks.add(task["job_id"], callback_url, product_data)
+            if self.broker.claim_finished(task["job_id"]):
+                self._finish_job(task["job_id"], callback_url)
+        return True
+
+    def _finish_job(self, job_id, callback_url):
+        """Send the final callback batch of a job whose last task this worker reported"""
+        status = self.broker.job_status(job_id)
+        # Other workers flush their own buffered products within the batch window, so the final
+        # batch may arrive before theirs; the summary tells the receiver how many to expect in total
+        self.webhooks.finish(job_id, callback_url, summary={
+            "success_count": status.get("done", 0),
+            "failed_count": status.get("failed", 0)
+        })
+
+    def run(self):
+        logging.info(f"Worker {self.worker_id} started")
+        while not self._stop.is_set():
+            if not self.run_once():
+                self._stop.wait(self.idle_sleep)
+        logging.info(f"Worker {self.worker_id} stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a distributed Amazon scraping worker")
+    parser.add_argument("--broker", default=os.environ.get("BROKER_URL", "sqlite:///broker.db"),
+                        help="Broker URL (sqlite:///path or redis://host:port/db)")
+    parser.add_argument("--country", default="in", help="Amazon marketplace domain suffix")
+    parser.add_argument("--lease", type=int, default=60, help="Lease duration in seconds")
+    parser.add_argument("--heartbeat", type=int, default=15, help="Heartbeat interval in seconds")
+    parser.add_argument("--tech-schema", default="tech_schema.json",
+                        help="Tech_* column registry shared with the web app so exports line up")
+    parser.add_argument("--webhook-secret", default=os.environ.get("WEBHOOK_SECRET"),
+                        help="HMAC key for callback batches (the web app's WEBHOOK_SECRET)")
+    parser.add_argument("--webhook-outbox", default="webhook_outbox.db", help="Outbox for undelivered callback batches")
+    parser.add_argument("--webhook-batch-size", type=int, default=25)
+    parser.add_argument("--webhook-batch-seconds", type=float, default=10)
+    parser.add_argument("--debug-html-dir", default="debug_html", help="Where fetched pages are saved ('' to disable)")
+    args = parser.parse_args()
+
+    configure_logging("amazon_scraper_worker.log")
+
+    from app import AmazonScraper
+
+    if args.debug_html_dir:
+        os.makedirs(args.debug_html_dir, exist_ok=True)
+
+    webhooks = None
+    if args.webhook_secret:
+        webhooks = WebhookDispatcher(
+            WebhookOutbox(args.webhook_outbox),
+            secret=args.webhook_secret,
+            batch_size=args.webhook_batch_size,
+            batch_seconds=args.webhook_batch_seconds
+        ).start()
+
+    worker = ScrapeWorker(
+        open_broker(args.broker),
+        AmazonScraper(country=args.country, tech_schema=TechSchemaRegistry(args.tech_schema),
+                      debug_html_dir=args.debug_html_dir or None),
+        lease_seconds=args.lease,
+        heartbeat_interval=args.heartbeat,
+        webhooks=webhooks
+    )
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == '__main__':
+    main()